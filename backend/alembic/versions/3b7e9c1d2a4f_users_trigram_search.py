@@ -0,0 +1,45 @@
+"""Users trigram search indexes
+
+Revision ID: 3b7e9c1d2a4f
+Revises: 8c328edf38dc
+Create Date: 2026-10-19 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e9c1d2a4f'
+down_revision: Union[str, None] = '8c328edf38dc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Les index GIN pg_trgm servent les recherches ILIKE '%...%'
+    # de /admin/users?q= (l'index b-tree sur name ne sert à rien
+    # pour une recherche par sous-chaîne).
+    # Uniquement pour PostgreSQL : en local (SQLite) la recherche
+    # passe par la table FTS5 créée au démarrage (utils/search.py).
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_name_trgm "
+        "ON users USING gin (name gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_email_trgm "
+        "ON users USING gin (email gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_users_email_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_users_name_trgm")
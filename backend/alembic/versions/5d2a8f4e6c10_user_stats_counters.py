@@ -0,0 +1,40 @@
+"""User stats counters
+
+Revision ID: 5d2a8f4e6c10
+Revises: 3b7e9c1d2a4f
+Create Date: 2026-10-19 10:03:17.842961
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8f4e6c10'
+down_revision: Union[str, None] = '3b7e9c1d2a4f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_stat_counters',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.create_table(
+        'user_signups_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('day'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_signups_daily')
+    op.drop_table('user_stat_counters')
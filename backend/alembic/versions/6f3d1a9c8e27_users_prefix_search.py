@@ -0,0 +1,55 @@
+"""Users prefix search indexes
+
+Revision ID: 6f3d1a9c8e27
+Revises: b4f8e2a6d913
+Create Date: 2026-10-19 18:04:12.381907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f3d1a9c8e27'
+down_revision: Union[str, None] = 'b4f8e2a6d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Les correspondances en début de nom / email sont lues dans
+    # l'ordre de ces index (LIKE 'terme%' + ORDER BY + LIMIT) :
+    # /admin/users?q= ne classe plus toutes les lignes trouvées.
+    # COLLATE "C" : l'ordre octet par octet permet à la fois le
+    # LIKE préfixe et le ORDER BY, quelle que soit la collation
+    # de la base.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_name_lower_prefix "
+        'ON users ((lower(name) COLLATE "C"))'
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_email_lower_prefix "
+        'ON users ((lower(email) COLLATE "C"))'
+    )
+    # Avec les statistiques par défaut, PostgreSQL estime ~1 % de
+    # correspondances pour un ILIKE '%...%' rare : avec le LIMIT de
+    # la recherche il lit alors toute la table au lieu de l'index
+    # trigram (1,2 s au lieu de 23 ms sur 2 M de comptes).
+    # Un histogramme plus fin corrige l'estimation.
+    op.execute("ALTER TABLE users ALTER COLUMN name SET STATISTICS 1000")
+    op.execute("ALTER TABLE users ALTER COLUMN email SET STATISTICS 1000")
+    op.execute("ANALYZE users")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("ALTER TABLE users ALTER COLUMN email SET STATISTICS -1")
+    op.execute("ALTER TABLE users ALTER COLUMN name SET STATISTICS -1")
+    op.execute("DROP INDEX IF EXISTS ix_users_email_lower_prefix")
+    op.execute("DROP INDEX IF EXISTS ix_users_name_lower_prefix")
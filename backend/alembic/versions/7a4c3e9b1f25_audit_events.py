@@ -0,0 +1,51 @@
+"""Audit events
+
+Revision ID: 7a4c3e9b1f25
+Revises: 5d2a8f4e6c10
+Create Date: 2026-10-19 11:26:54.117390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4c3e9b1f25'
+down_revision: Union[str, None] = '5d2a8f4e6c10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'audit_events',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'),
+                  autoincrement=True, nullable=False),
+        sa.Column('event_type', sa.String(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('actor_id', sa.Integer(), nullable=True),
+        sa.Column('ip', sa.String(), nullable=True),
+        sa.Column('detail', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_audit_events_event_type'), 'audit_events',
+                    ['event_type'], unique=False)
+    op.create_index(op.f('ix_audit_events_user_id'), 'audit_events',
+                    ['user_id'], unique=False)
+    op.create_index(op.f('ix_audit_events_created_at'), 'audit_events',
+                    ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_audit_events_created_at'),
+                  table_name='audit_events')
+    op.drop_index(op.f('ix_audit_events_user_id'), table_name='audit_events')
+    op.drop_index(op.f('ix_audit_events_event_type'),
+                  table_name='audit_events')
+    op.drop_table('audit_events')
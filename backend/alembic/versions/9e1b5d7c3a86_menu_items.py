@@ -0,0 +1,45 @@
+"""Menu items
+
+Revision ID: 9e1b5d7c3a86
+Revises: 7a4c3e9b1f25
+Create Date: 2026-10-19 13:48:02.664105
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e1b5d7c3a86'
+down_revision: Union[str, None] = '7a4c3e9b1f25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'menu_items',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('price', sa.Numeric(10, 2), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('is_available', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_menu_items_id'), 'menu_items', ['id'],
+                    unique=False)
+    op.create_index(op.f('ix_menu_items_category'), 'menu_items',
+                    ['category'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_menu_items_category'), table_name='menu_items')
+    op.drop_index(op.f('ix_menu_items_id'), table_name='menu_items')
+    op.drop_table('menu_items')
@@ -0,0 +1,92 @@
+# benchmarks/bench_auth_lookup.py
+
+# Compare le coût CPU d'une recherche d'utilisateur par email,
+# tel qu'exécuté à chaque login et à chaque requête authentifiée :
+# - "orm"  : ancienne requête db.query(User).filter(...).first()
+# - "core" : crud/auth.get_auth_user_by_email (select Core
+#            précompilé, AuthUser à slots)
+# Chaque recherche utilise une nouvelle session, comme une
+# requête HTTP (get_db), pour ne pas profiter de la carte
+# d'identité de l'ORM.
+#
+# Usage (depuis le dossier backend) :
+#   python benchmarks/bench_auth_lookup.py --users 20000 --lookups 20000
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_database(users: int):
+    tmp = tempfile.mkdtemp()
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{tmp}/bench.db",
+        "SECRET_KEY": "bench",
+        "ALGORITHM": "HS256",
+        "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+        "REDIS_URL": "",
+    })
+    sys.path.insert(0, BACKEND_DIR)
+    from sqlalchemy import insert
+
+    from database import Base, engine
+    from models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": f"Client {i}", "email": f"client{i}@bench.local",
+             "hashed_password": "x" * 60, "role": "client"}
+            for i in range(users)
+        ])
+
+
+def orm_lookup(db, email: str):
+    from models.user import User
+    return db.query(User).filter(User.email == email).first()
+
+
+def core_lookup(db, email: str):
+    from crud.auth import get_auth_user_by_email
+    return get_auth_user_by_email(db, email)
+
+
+def measure(lookup, emails: list[str]) -> float:
+    # Temps CPU moyen par recherche (µs), session neuve à chaque fois
+    from database import SessionLocal
+    for email in emails[:200]:
+        # Échauffement : remplit le cache de compilation
+        with SessionLocal() as db:
+            lookup(db, email)
+    started = time.process_time()
+    for email in emails:
+        with SessionLocal() as db:
+            assert lookup(db, email) is not None
+    return (time.process_time() - started) * 1_000_000 / len(emails)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    prepare_database(args.users)
+    rng = random.Random(42)
+    emails = [f"client{rng.randrange(args.users)}@bench.local"
+              for _ in range(args.lookups)]
+
+    orm = measure(orm_lookup, emails)
+    core = measure(core_lookup, emails)
+    print(f"recherches      : {args.lookups} sur {args.users} utilisateurs")
+    print(f"orm             : {orm:.1f} µs CPU / recherche")
+    print(f"core précompilé : {core:.1f} µs CPU / recherche")
+    print(f"gain            : {orm - core:.1f} µs ({1 - core / orm:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# benchmarks/bench_compression.py
+
+# Compare les encodeurs de utils/compression.py (gzip, brotli,
+# zstd) par niveau sur des charges réalistes :
+# - "json" : réponse de GET /admin/users (liste de UserOut)
+# - "csv"  : export GET /admin/users/export, compressé en
+#            streaming (un flush par morceau de 1000 lignes)
+# Pour chaque niveau : octets envoyés, ratio, temps CPU par Mo
+# d'entrée, et temps total estimé (CPU + transfert) sur une
+# connexion lente de restaurant.
+#
+# Usage (depuis le dossier backend) :
+#   python benchmarks/bench_compression.py --users 20000 --mbps 2
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from utils.compression import available_encoders  # noqa: E402
+
+LEVELS = {
+    "gzip": (1, 3, 5, 6, 7, 9),
+    "br": (1, 3, 4, 5, 6, 8, 11),
+    "zstd": (1, 3, 6, 9, 15, 19),
+}
+
+FIRST_NAMES = ("Awa", "Moussa", "Fatou", "Ibrahima", "Aminata", "Cheikh",
+               "Mariama", "Ousmane", "Khady", "Mamadou", "Claire", "Louis")
+LAST_NAMES = ("Diop", "Ndiaye", "Fall", "Sow", "Ba", "Gueye", "Faye",
+              "Sarr", "Martin", "Bernard", "Diallo", "Mbaye")
+DOMAINS = ("gmail.com", "yahoo.fr", "hotmail.com", "restaurant.sn")
+
+
+def fake_users(count: int) -> list[dict]:
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    users = []
+    for user_id in range(1, count + 1):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        users.append({
+            "id": user_id,
+            "name": f"{first} {last}",
+            "email": f"{first.lower()}.{last.lower()}{user_id}@"
+                     f"{rng.choice(DOMAINS)}",
+            "role": rng.choices(("client", "staff", "admin"),
+                                (90, 9, 1))[0],
+            "created_at": (start + timedelta(
+                seconds=rng.randrange(60 * 60 * 24 * 600))).isoformat(),
+            "is_active": rng.random() > 0.05,
+        })
+    return users
+
+
+def json_payload(users: list[dict]) -> list[bytes]:
+    # Même format que la réponse JSON de FastAPI (un seul morceau)
+    return [json.dumps(users, ensure_ascii=False,
+                       separators=(",", ":")).encode()]
+
+
+def csv_chunks(users: list[dict], rows_per_chunk: int = 1000) -> list[bytes]:
+    chunks = []
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(list(users[0]))
+    for count, user in enumerate(users, 1):
+        writer.writerow(user.values())
+        if count % rows_per_chunk == 0:
+            chunks.append(buffer.getvalue().encode())
+            buffer.seek(0)
+            buffer.truncate()
+    chunks.append(buffer.getvalue().encode())
+    return chunks
+
+
+def compress(encoder_cls, level: int, chunks: list[bytes]) -> int:
+    encoder = encoder_cls(level)
+    size = 0
+    for chunk in chunks[:-1]:
+        size += len(encoder.compress(chunk)) + len(encoder.flush())
+    size += len(encoder.compress(chunks[-1])) + len(encoder.finish())
+    return size
+
+
+def measure(encoder_cls, level: int, chunks: list[bytes],
+            min_seconds: float = 0.5) -> tuple[int, float]:
+    # Temps CPU moyen (process_time) sur plusieurs répétitions
+    runs = 0
+    started = time.process_time()
+    while True:
+        size = compress(encoder_cls, level, chunks)
+        runs += 1
+        elapsed = time.process_time() - started
+        if elapsed >= min_seconds:
+            return size, elapsed / runs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20000)
+    # Débit descendant de la connexion du restaurant (Mbit/s)
+    parser.add_argument("--mbps", type=float, default=2.0)
+    args = parser.parse_args()
+
+    users = fake_users(args.users)
+    encoders = available_encoders()
+    bytes_per_second = args.mbps * 1_000_000 / 8
+
+    for name, chunks in (("json", json_payload(users)),
+                         ("csv", csv_chunks(users))):
+        raw = sum(len(chunk) for chunk in chunks)
+        print(f"\n== {name} : {raw / 1024:.0f} Kio non compressés, "
+              f"{len(chunks)} morceau(x), "
+              f"transfert brut {raw / bytes_per_second:.2f} s "
+              f"à {args.mbps} Mbit/s")
+        print(f"{'encodage':<6} {'niveau':>6} {'Kio':>8} {'ratio':>6} "
+              f"{'CPU ms/Mo':>10} {'CPU ms':>8} {'total s':>8}")
+        for encoding, levels in LEVELS.items():
+            if encoding not in encoders:
+                print(f"{encoding:<6} (bibliothèque non installée)")
+                continue
+            for level in levels:
+                size, cpu = measure(encoders[encoding], level, chunks)
+                total = cpu + size / bytes_per_second
+                print(f"{encoding:<6} {level:>6} {size / 1024:>8.1f} "
+                      f"{raw / size:>6.1f} "
+                      f"{cpu * 1000 / (raw / 1_048_576):>10.1f} "
+                      f"{cpu * 1000:>8.1f} {total:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# benchmarks/bench_kitchen_connections.py
+
+# Mesure le coût des connexions WebSocket cuisine inactives sur
+# UN worker uvicorn, et le temps de diffusion d'un changement de
+# statut de commande à toutes les connexions.
+#
+# Usage (depuis le dossier backend) :
+#   python benchmarks/bench_kitchen_connections.py --connections 5000
+#
+# Le script lance lui-même uvicorn sur une base SQLite
+# temporaire, sans Redis (diffusion locale au worker).
+# Prérequis : uvicorn[standard] (fournit la bibliothèque websockets)
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import uuid
+
+import websockets
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_kib(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def prepare_database(env: dict) -> tuple[str, str]:
+    # Crée un utilisateur staff et une commande dans la base
+    # temporaire, puis renvoie (token, id de commande)
+    os.environ.update(env)
+    sys.path.insert(0, BACKEND_DIR)
+    from database import Base, SessionLocal, engine
+    from models.order import Order
+    from models.user import User, UserRole
+    from utils.security import create_access_token
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    staff = User(name="Cuisine", email="kitchen@bench.local",
+                 hashed_password="x", role=UserRole.staff)
+    db.add(staff)
+    db.commit()
+    order_id = str(uuid.uuid4())
+    db.add(Order(id=order_id, user_id=staff.id, total=1000))
+    db.commit()
+    db.close()
+    token = create_access_token({"sub": "kitchen@bench.local",
+                                 "role": "staff"})
+    return token, order_id
+
+
+def wait_ready(base_url: str, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(base_url + "/", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("uvicorn n'a pas démarré")
+
+
+def change_status(base_url: str, token: str, order_id: str, status: str):
+    request = urllib.request.Request(
+        f"{base_url}/orders/{order_id}/status",
+        data=f'{{"status": "{status}"}}'.encode(),
+        method="PUT",
+        headers={"Authorization": f"Bearer {token}",
+                 "Content-Type": "application/json"},
+    )
+    urllib.request.urlopen(request, timeout=30).read()
+
+
+async def run_clients(ws_url: str, count: int, base_url: str, token: str,
+                      order_id: str, server_pid: int):
+    baseline = rss_kib(server_pid)
+    connections = []
+    started = time.perf_counter()
+    for start in range(0, count, 200):
+        batch = [websockets.connect(ws_url, max_queue=4, ping_interval=None)
+                 for _ in range(start, min(start + 200, count))]
+        connections.extend(await asyncio.gather(*batch))
+    connect_time = time.perf_counter() - started
+    # Laisse le serveur se stabiliser avant de mesurer
+    await asyncio.sleep(2)
+    loaded = rss_kib(server_pid)
+
+    started = time.perf_counter()
+    await asyncio.to_thread(change_status, base_url, token, order_id,
+                            "preparing")
+    await asyncio.gather(*(ws.recv() for ws in connections))
+    fanout_time = time.perf_counter() - started
+
+    for ws in connections:
+        await ws.close()
+
+    print(f"connexions             : {count}")
+    print(f"ouverture              : {connect_time:.2f} s")
+    print(f"RSS worker au repos    : {baseline / 1024:.1f} Mo")
+    print(f"RSS worker connecté    : {loaded / 1024:.1f} Mo")
+    print(f"mémoire par connexion  : "
+          f"{(loaded - baseline) / count:.1f} Kio")
+    print(f"diffusion à tous       : {fanout_time * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8765)
+    # Implémentation WebSocket d'uvicorn à comparer
+    # (auto, websockets, websockets-sansio, wsproto)
+    parser.add_argument("--ws", default="auto")
+    args = parser.parse_args()
+
+    # Chaque connexion utilise un descripteur côté client et un
+    # côté serveur
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, args.connections * 2 + 256)
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+    tmp = tempfile.mkdtemp()
+    env = {
+        "DATABASE_URL": f"sqlite:///{tmp}/bench.db",
+        "SECRET_KEY": "bench",
+        "ALGORITHM": "HS256",
+        "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+        "REDIS_URL": "",
+        "USER_STATS_RECONCILE_SECONDS": "0",
+    }
+    token, order_id = prepare_database(env)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port",
+         str(args.port), "--ws", args.ws, "--log-level", "warning"],
+        cwd=BACKEND_DIR, env={**os.environ, **env},
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_ready(base_url)
+        asyncio.run(run_clients(
+            f"ws://127.0.0.1:{args.port}/kitchen/ws?token={token}",
+            args.connections, base_url, token, order_id, server.pid))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
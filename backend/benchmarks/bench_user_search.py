@@ -0,0 +1,129 @@
+# benchmarks/bench_user_search.py
+
+# Mesure la recherche /admin/users?q= (crud/user.search_users)
+# sur une grosse table users PostgreSQL : temps médian par terme
+# et, si demandé, le plan EXPLAIN ANALYZE de la requête.
+# Les termes couvrent les cas difficiles : très fréquent
+# ("gmail"), préfixe de nom fréquent ("awa"), email presque
+# unique, et terme sans aucun résultat.
+#
+# Usage (depuis le dossier backend, base migrée jusqu'à head) :
+#   DATABASE_URL=postgresql+psycopg2://... \
+#       python benchmarks/bench_user_search.py --users 2000000
+#   ... --explain fatou.ndiaye
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from sqlalchemy import event, func, select, text  # noqa: E402
+
+from crud.user import search_users  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from models.user import User  # noqa: E402
+
+TERMS = ("gmail", "diop", "awa", "fatou.ndiaye", "mbaye123456",
+         "ndiaye1999", "zzqx")
+
+# Génération côté serveur : des millions de lignes en une requête
+SEED_SQL = """
+INSERT INTO users (name, email, hashed_password, role, created_at,
+                   is_active)
+SELECT first || ' ' || last,
+       lower(first) || '.' || lower(last) || n || '@' || domain,
+       'x', 'client', now() - n * interval '1 second', true
+FROM (
+    SELECT n,
+           (ARRAY['Awa', 'Moussa', 'Fatou', 'Ibrahima', 'Aminata',
+                  'Cheikh', 'Mariama', 'Ousmane', 'Khady', 'Mamadou',
+                  'Claire', 'Louis'])[1 + floor(random() * 12)::int]
+               AS first,
+           (ARRAY['Diop', 'Ndiaye', 'Fall', 'Sow', 'Ba', 'Gueye', 'Faye',
+                  'Sarr', 'Martin', 'Bernard', 'Diallo', 'Mbaye'])
+               [1 + floor(random() * 12)::int] AS last,
+           (ARRAY['gmail.com', 'yahoo.fr', 'hotmail.com', 'orange.sn'])
+               [1 + floor(random() * 4)::int] AS domain
+    FROM generate_series(:start, :stop) AS n
+) AS generated
+"""
+
+
+def seed(users: int):
+    with SessionLocal() as db:
+        existing = db.scalar(select(func.count()).select_from(User))
+        if existing >= users:
+            return
+        db.execute(text("SELECT setseed(0.42)"))
+        db.execute(text(SEED_SQL), {"start": existing, "stop": users - 1})
+        db.commit()
+    with engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE users"))
+
+
+def measure(term: str, repeat: int) -> tuple[float, int]:
+    # Temps médian (ms) d'un appel à search_users, cache chaud
+    with SessionLocal() as db:
+        found = len(search_users(db, term))
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            search_users(db, term)
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), found
+
+
+def explain(term: str):
+    # Capture la requête réellement émise par search_users
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, many):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with SessionLocal() as db:
+            search_users(db, term)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    statement, parameters = statements[-1]
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("EXPLAIN (ANALYZE, COSTS OFF) " + statement,
+                       parameters)
+        for (line,) in cursor.fetchall():
+            print(line)
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--explain", metavar="TERME")
+    parser.add_argument("terms", nargs="*", default=TERMS)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("DATABASE_URL doit pointer vers PostgreSQL")
+    seed(args.users)
+    if args.explain:
+        explain(args.explain)
+        return
+
+    with SessionLocal() as db:
+        total = db.scalar(select(func.count()).select_from(User))
+    print(f"utilisateurs : {total}")
+    for term in args.terms:
+        median, found = measure(term, args.repeat)
+        print(f"{term:<15} {median:8.1f} ms  ({found} résultats)")
+
+
+if __name__ == "__main__":
+    main()
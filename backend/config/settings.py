@@ -25,6 +25,64 @@ class Settings(BaseSettings):
     # Par exemple, 30 signifie que le token expire au bout de 30 minutes.
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # URL de connexion à Redis. Vide = pas de Redis (exécution
+    # locale / tests) : les fonctionnalités qui l'utilisent
+    # retombent sur un fonctionnement mono-processus.
+    REDIS_URL: str = "redis://redis:6379"
+
+    # Filtre de Bloom des emails inscrits (login / inscription) :
+    # - "auto" : "redis" si REDIS_URL est défini, sinon "memory"
+    #   avec un seul worker et "off" avec plusieurs
+    # - "memory" : bits en mémoire du processus (UN SEUL worker :
+    #   un email inscrit via un autre worker y serait absent)
+    # - "redis" : bits partagés dans Redis (plusieurs workers)
+    # - "off" : désactivé, chaque login interroge la base
+    EMAIL_FILTER_BACKEND: str = "auto"
+    # Nombre d'emails prévus et taux de faux positifs visé
+    # (1 000 000 / 0.001 ≈ 1,8 Mo de bits)
+    EMAIL_FILTER_CAPACITY: int = 1_000_000
+    EMAIL_FILTER_ERROR_RATE: float = 0.001
+    # Backend "redis" : intervalle de vérification du filtre
+    # partagé, reconstruit s'il a été désactivé (éviction, panne)
+    EMAIL_FILTER_CHECK_SECONDS: int = 60
+
+    # Journal d'audit (utils/audit.py) : taille max du tampon en
+    # mémoire, taille des lots d'INSERT et délai max avant écriture
+    AUDIT_BUFFER_SIZE: int = 10_000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_SECONDS: float = 1.0
+
+    # Durée max (en secondes) de la carte en cache si un message
+    # d'invalidation Redis est manqué
+    MENU_CACHE_TTL_SECONDS: float = 300.0
+
+    # File des commandes (utils/order_queue.py) : nombre de
+    # commandes enregistrées par transaction, délai avant de
+    # réessayer une commande en échec, et nombre de tentatives
+    # avant envoi en dead-letter
+    ORDERS_WORKER_ENABLED: bool = True
+    ORDERS_BATCH_SIZE: int = 100
+    ORDERS_RETRY_IDLE_MS: int = 30_000
+    ORDERS_MAX_DELIVERIES: int = 5
+
+    # Flux cuisine (/kitchen/ws, /kitchen/events) : messages en
+    # attente max par écran avant déconnexion, et délai max
+    # d'envoi d'un message à un écran
+    KITCHEN_QUEUE_SIZE: int = 100
+    KITCHEN_SEND_TIMEOUT_SECONDS: float = 5.0
+
+    # Compression des réponses (utils/compression.py) : taille
+    # minimale en octets, et niveaux par algorithme (brotli et
+    # zstd ne sont utilisés que si leur bibliothèque est installée)
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_LEVEL: int = 5
+    COMPRESSION_ZSTD_LEVEL: int = 9
+
+    # Intervalle (en secondes) entre deux recalculs complets des
+    # statistiques utilisateurs (/admin/stats). 0 = désactivé.
+    USER_STATS_RECONCILE_SECONDS: int = 3600
+
     # Classe de configuration interne à Pydantic.
     # Elle permet ici de spécifier le chemin vers le fichier .env qui contient 
     # les variables d'environnement.
@@ -0,0 +1,15 @@
+from sqlalchemy.orm import Session
+
+from models.audit import AuditEvent
+
+
+def get_audit_events(db: Session, limit: int = 100,
+                     event_type: str | None = None,
+                     user_id: int | None = None):
+    # Événements les plus récents d'abord
+    query = db.query(AuditEvent)
+    if event_type:
+        query = query.filter(AuditEvent.event_type == event_type)
+    if user_id is not None:
+        query = query.filter(AuditEvent.user_id == user_id)
+    return query.order_by(AuditEvent.id.desc()).limit(limit).all()
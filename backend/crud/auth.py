@@ -0,0 +1,54 @@
+# crud/auth.py
+
+# Accès à la base pour l'authentification (login et
+# vérification du JWT à chaque requête protégée).
+# Chemin le plus sollicité de l'API : au lieu de construire une
+# Query ORM et d'hydrater un objet User complet à chaque appel,
+# on exécute une requête Core construite une seule fois (sa
+# forme compilée est réutilisée via le cache de compilation de
+# SQLAlchemy) et on renvoie un petit objet immuable.
+from dataclasses import dataclass
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+from models.user import User, UserRole
+
+# Table Core (pas l'entité ORM) : pas de contexte ORM ni de
+# carte d'identité à l'exécution
+_users = User.__table__
+
+_USER_BY_EMAIL = (
+    select(_users.c.id, _users.c.email, _users.c.hashed_password,
+           _users.c.role, _users.c.is_active)
+    .where(_users.c.email == bindparam("email"))
+    .limit(1)
+)
+
+
+@dataclass(frozen=True, slots=True)
+class AuthUser:
+    # Sous-ensemble de User utile à l'authentification et aux
+    # contrôles de rôle (mêmes noms d'attributs que le modèle)
+    id: int
+    email: str
+    hashed_password: str
+    role: UserRole
+    is_active: bool | None
+
+
+def inactive_user_ids(db: Session, user_ids) -> set[int]:
+    # Parmi user_ids, ceux dont le compte a été désactivé
+    # (is_active NULL compte comme actif)
+    return set(db.connection().execute(
+        select(_users.c.id)
+        .where(_users.c.id.in_(list(user_ids)))
+        .where(_users.c.is_active.is_(False))
+    ).scalars())
+
+
+def get_auth_user_by_email(db: Session, email: str) -> AuthUser | None:
+    # Passe par la connexion de la session : même transaction que
+    # le reste de la requête, sans la couche ORM
+    row = db.connection().execute(_USER_BY_EMAIL, {"email": email}).first()
+    return AuthUser(*row) if row else None
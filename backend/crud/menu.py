@@ -0,0 +1,44 @@
+# crud/menu.py
+
+from sqlalchemy.orm import Session
+
+from models.menu import MenuItem
+from schemas.menu import MenuItemCreate, MenuItemUpdate
+
+
+def get_menu_items(db: Session):
+    # Carte complète, triée par catégorie puis par nom
+    return (db.query(MenuItem)
+            .order_by(MenuItem.category, MenuItem.name, MenuItem.id)
+            .all())
+
+
+def get_menu_item(db: Session, item_id: int):
+    return db.query(MenuItem).filter(MenuItem.id == item_id).first()
+
+
+def create_menu_item(db: Session, item: MenuItemCreate):
+    db_item = MenuItem(**item.model_dump())
+    db.add(db_item)
+    db.commit()
+    db.refresh(db_item)
+    return db_item
+
+
+def update_menu_item(db: Session, item_id: int, data: MenuItemUpdate):
+    db_item = get_menu_item(db, item_id)
+    if db_item:
+        for field, value in data.model_dump(exclude_unset=True).items():
+            setattr(db_item, field, value)
+        db.commit()
+        db.refresh(db_item)
+    return db_item
+
+
+def delete_menu_item(db: Session, item_id: int) -> bool:
+    db_item = get_menu_item(db, item_id)
+    if not db_item:
+        return False
+    db.delete(db_item)
+    db.commit()
+    return True
@@ -0,0 +1,54 @@
+# crud/order.py
+
+from datetime import datetime
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from models.order import Order, OrderItem, OrderStatus
+
+
+def get_order(db: Session, order_id: str):
+    return db.query(Order).filter(Order.id == order_id).first()
+
+
+def persist_orders(db: Session, orders: list[dict]) -> list[str]:
+    # Enregistre un lot de commandes venant de la file Redis en
+    # deux INSERT multi-lignes (orders puis order_items), sans
+    # commit. Les commandes déjà présentes (message rejoué) sont
+    # ignorées. Renvoie les id réellement insérés.
+    ids = [order["id"] for order in orders]
+    existing = set(db.execute(
+        select(Order.id).where(Order.id.in_(ids))
+    ).scalars())
+    order_rows = []
+    item_rows = []
+    for order in orders:
+        if order["id"] in existing:
+            continue
+        # Un même message peut apparaître deux fois dans un lot
+        existing.add(order["id"])
+        order_rows.append({
+            "id": order["id"],
+            "user_id": order["user_id"],
+            "status": OrderStatus.received,
+            "total": order["total"],
+            "note": order.get("note"),
+            "created_at": datetime.fromisoformat(order["created_at"]),
+            "updated_at": datetime.utcnow(),
+        })
+        item_rows.extend({"order_id": order["id"], **item}
+                         for item in order["items"])
+    if order_rows:
+        db.execute(insert(Order), order_rows)
+        db.execute(insert(OrderItem), item_rows)
+    return [row["id"] for row in order_rows]
+
+
+def update_order_status(db: Session, order_id: str, new_status: str):
+    order = get_order(db, order_id)
+    if order:
+        setattr(order, "status", OrderStatus(new_status))
+        db.commit()
+        db.refresh(order)
+    return order
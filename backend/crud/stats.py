@@ -0,0 +1,191 @@
+# crud/stats.py
+
+# Statistiques utilisateurs maintenues de façon incrémentale.
+# Les fonctions "bump_*" ne font PAS de commit : elles sont
+# appelées par crud/user.py juste avant le commit de la
+# modification, pour que compteurs et données restent cohérents.
+# Ordre des verrous (compteurs puis jours, chacun par clé
+# croissante) identique dans bump_user_counters et
+# reconcile_user_stats, pour éviter les interblocages.
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from models.stats import UserSignupDaily, UserStatCounter
+from models.user import User, UserRole
+
+# Verrou consultatif PostgreSQL : un seul recalcul à la fois
+RECONCILE_LOCK_KEY = 5_202_718_027
+
+
+def role_counter(role) -> str:
+    # Nom du compteur d'un rôle ("role:client", ...)
+    return f"role:{UserRole(role).value}"
+
+
+def active_counter(is_active: bool) -> str:
+    return "active" if is_active else "inactive"
+
+
+def _dialect_insert(db: Session):
+    # INSERT ... ON CONFLICT DO UPDATE est disponible sous
+    # PostgreSQL et SQLite ; None pour les autres bases
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def _increment(db: Session, model, key_column, value_column, key, delta):
+    # Ajoute "delta" à la ligne "key" (créée si elle n'existe pas)
+    insert = _dialect_insert(db)
+    if insert is not None:
+        stmt = insert(model).values({key_column.key: key,
+                                     value_column.key: delta})
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[key_column],
+            set_={value_column.key: value_column + delta},
+        )
+        db.execute(stmt)
+        return
+    result = db.execute(
+        update(model)
+        .where(key_column == key)
+        .values({value_column.key: value_column + delta})
+    )
+    if result.rowcount == 0:
+        db.add(model(**{key_column.key: key, value_column.key: delta}))
+
+
+def bump_user_counters(db: Session, deltas: dict[str, int],
+                       signup_day: date | None = None):
+    # Applique les variations de compteurs d'une opération
+    # (ex: {"role:client": 1, "active": 1}) sans commit
+    for name, delta in sorted(deltas.items()):
+        if delta:
+            _increment(db, UserStatCounter, UserStatCounter.name,
+                       UserStatCounter.value, name, delta)
+    if signup_day is not None:
+        _increment(db, UserSignupDaily, UserSignupDaily.day,
+                   UserSignupDaily.count, signup_day, 1)
+
+
+def get_user_stats(db: Session, days: int = 30):
+    # Lecture O(1) (hors nombre de jours demandés) : aucune
+    # agrégation sur la table users
+    counters = dict(db.execute(
+        select(UserStatCounter.name, UserStatCounter.value)
+    ).all())
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    signups = db.execute(
+        select(UserSignupDaily.day, UserSignupDaily.count)
+        .where(UserSignupDaily.day >= since, UserSignupDaily.count > 0)
+        .order_by(UserSignupDaily.day)
+    ).all()
+    return {
+        "roles": {role.value: counters.get(role_counter(role), 0)
+                  for role in UserRole},
+        "active": counters.get(active_counter(True), 0),
+        "inactive": counters.get(active_counter(False), 0),
+        "signups_per_day": [{"day": day, "count": count}
+                            for day, count in signups],
+    }
+
+
+def _ensure_rows(db: Session, model, key_column, value_column, keys):
+    # Crée à 0 les lignes manquantes, sans toucher aux existantes
+    insert = _dialect_insert(db)
+    if insert is not None:
+        db.execute(
+            insert(model)
+            .values([{key_column.key: key, value_column.key: 0}
+                     for key in keys])
+            .on_conflict_do_nothing(index_elements=[key_column])
+        )
+        return
+    existing = set(db.scalars(select(key_column).where(
+        key_column.in_(keys))))
+    db.add_all([model(**{key_column.key: key, value_column.key: 0})
+                for key in keys if key not in existing])
+    db.flush()
+
+
+def _try_reconcile_lock(db: Session) -> bool:
+    # Sous PostgreSQL, verrou consultatif libéré au commit ; sous
+    # SQLite la première écriture verrouille déjà toute la base
+    if db.get_bind().dialect.name != "postgresql":
+        return True
+    return bool(db.execute(
+        select(func.pg_try_advisory_xact_lock(RECONCILE_LOCK_KEY))
+    ).scalar())
+
+
+def reconcile_user_stats(db: Session, days: int = 90) -> bool:
+    # Recalcule les compteurs à partir de la table users
+    # (COUNT/GROUP BY) et écrit les valeurs absolues.
+    # Les inscriptions par jour ne sont recalculées que sur les
+    # "days" derniers jours : l'historique plus ancien ne bouge plus.
+    # Renvoie False si un autre recalcul est déjà en cours.
+    if not _try_reconcile_lock(db):
+        db.rollback()
+        return False
+    names = sorted([role_counter(role) for role in UserRole]
+                   + [active_counter(True), active_counter(False)])
+    today = datetime.utcnow().date()
+    since = today - timedelta(days=days - 1)
+    day_keys = [since + timedelta(days=offset) for offset in range(days)]
+
+    # Les lignes sont créées si besoin puis verrouillées AVANT les
+    # COUNT : une inscription en cours attend la fin du recalcul
+    # (son +1 s'applique ensuite) ou est déjà validée et comptée
+    _ensure_rows(db, UserStatCounter, UserStatCounter.name,
+                 UserStatCounter.value, names)
+    db.execute(select(UserStatCounter.name)
+               .where(UserStatCounter.name.in_(names))
+               .order_by(UserStatCounter.name)
+               .with_for_update())
+    _ensure_rows(db, UserSignupDaily, UserSignupDaily.day,
+                 UserSignupDaily.count, day_keys)
+    db.execute(select(UserSignupDaily.day)
+               .where(UserSignupDaily.day >= since)
+               .order_by(UserSignupDaily.day)
+               .with_for_update())
+
+    counters = dict.fromkeys(names, 0)
+    for role, count in db.execute(
+            select(User.role, func.count()).group_by(User.role)):
+        if role is not None:
+            counters[role_counter(role)] = count
+    for is_active, count in db.execute(
+            select(User.is_active, func.count()).group_by(User.is_active)):
+        # is_active NULL est traité comme actif (valeur par défaut)
+        name = active_counter(is_active is not False)
+        counters[name] += count
+
+    signup_day = func.date(User.created_at)
+    daily = {
+        # SQLite renvoie date() sous forme de chaîne
+        day if isinstance(day, date) else date.fromisoformat(day): count
+        for day, count in db.execute(
+            select(signup_day, func.count())
+            .where(User.created_at >= datetime.combine(
+                since, datetime.min.time()))
+            .where(User.created_at < datetime.combine(
+                today + timedelta(days=1), datetime.min.time()))
+            .group_by(signup_day)
+        )
+    }
+
+    # Mise à jour par clé primaire des lignes verrouillées
+    db.execute(update(UserStatCounter),
+               [{"name": name, "value": counters[name]} for name in names])
+    db.execute(update(UserSignupDaily),
+               [{"day": day, "count": daily.get(day, 0)}
+                for day in day_keys])
+    db.commit()
+    return True
@@ -1,6 +1,8 @@
 # Importation de la session SQLAlchemy pour
 # interagir avec la base de données
 from sqlalchemy.orm import Session
+from sqlalchemy import (case, column, func, or_, select, table, text,
+                        union)
 
 # Importation du modèle User
 # UserRole est utilisé pour l'attribution du rôle (Enum)
@@ -10,6 +12,23 @@ from models.user import User, UserRole
 # Importation du schéma d'entrée pour la création d'un utilisateur
 from schemas.user import UserCreate
 
+# Outils de recherche (échappement LIKE, FTS5 pour SQLite)
+from utils.search import (MIN_TRIGRAM_LENGTH, SEARCH_CANDIDATES,
+                          SQLITE_FTS_TABLE, escape_like, fts_phrase,
+                          sqlite_fts_ready)
+
+# Compteurs des statistiques utilisateurs (/admin/stats)
+from crud.stats import active_counter, bump_user_counters, role_counter
+
+# Filtre de Bloom des emails inscrits (login / inscription)
+from utils.email_filter import EmailFilterUnavailable, email_filter
+
+# Journal d'audit (changements de rôle / d'activation)
+from utils.audit import audit_writer
+
+# Importation de datetime pour dater l'inscription
+from datetime import datetime
+
 # Importation de Passlib pour le hachage du mot de passe
 from passlib.context import CryptContext
 
@@ -23,12 +42,9 @@ from passlib.context import CryptContext
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-def get_user_by_email(db: Session, email):
-    # Exécute une requête
-    # SELECT * FROM users WHERE email = ...
-    # .first() renvoie le premier résultat
-    # trouvé ou None s'il n'y a pas de correspondance
-    return db.query(User).filter(User.email == email).first()
+# 2. La recherche d'un utilisateur par email (login, JWT) se
+# fait avec crud.auth.get_auth_user_by_email (requête Core
+# précompilée)
 
 
 # 3. Fonction pour créer un nouvel utilisateur
@@ -39,19 +55,42 @@ def create_user(db: Session, user: UserCreate):
     # via bcrypt pour qu'il ne soit jamais stocké en clair
     hashed_password = pwd_context.hash(user.password)
 
+    # Date d'inscription fixée ici pour qu'elle corresponde
+    # exactement au jour compté dans les statistiques
+    created_at = datetime.utcnow()
+
     # Création d'un objet User (modèle SQLAlchemy) avec
     # les données de l'utilisateur
     db_user = User(
         name=user.name,
         email=user.email,
         hashed_password=hashed_password,
-        role=user.role
+        role=user.role,
+        created_at=created_at,
+        is_active=True
     )
 
     # Ajout de l'objet à la session de base de données
     #  (mais pas encore enregistré)
     db.add(db_user)
 
+    # Mise à jour des compteurs dans la même transaction
+    bump_user_counters(
+        db,
+        {role_counter(user.role): 1, active_counter(True): 1},
+        signup_day=created_at.date(),
+    )
+
+    # Le nouvel email doit être connu du filtre de Bloom AVANT
+    # le commit, sinon un login immédiat le considérerait comme
+    # inexistant. Si le filtre partagé ne peut être mis à jour,
+    # l'inscription est annulée plutôt que de créer un faux négatif.
+    try:
+        email_filter.add(user.email)
+    except EmailFilterUnavailable:
+        db.rollback()
+        raise
+
     # Validation des modifications (INSERT dans la base)
     db.commit()
 
@@ -68,7 +107,93 @@ def get_all_users(db: Session):
     return db.query(User).all()
 
 
-def update_user_role(db: Session, user_id: int, role: str):
+def iter_users(db: Session, batch_size: int = 1000):
+    # Parcourt tous les utilisateurs par lots (curseur côté
+    # serveur sous PostgreSQL) sans tout charger en mémoire
+    result = db.execute(
+        select(User.id, User.name, User.email, User.role,
+               User.created_at, User.is_active)
+        .order_by(User.id)
+        .execution_options(yield_per=batch_size)
+    )
+    yield from result
+
+
+def search_users(db: Session, q: str, limit: int = 20):
+    # Recherche par sous-chaîne sur le nom et l'email, classée :
+    # 1. les correspondances en début de nom/email
+    # 2. puis (PostgreSQL) par similarité trigram décroissante
+    # 3. puis par id pour un ordre stable
+    term = q.strip()
+    if not term:
+        return []
+
+    escaped = escape_like(term)
+    prefix = f"{escaped}%"
+    pattern = f"%{escaped}%"
+    is_prefix = or_(User.name.ilike(prefix, escape="\\"),
+                    User.email.ilike(prefix, escape="\\"))
+    order_by = [case((is_prefix, 0), else_=1)]
+
+    query = db.query(User)
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        # PostgreSQL : on ne classe jamais toutes les correspondances
+        # (un terme fréquent comme "gmail" en renvoie des centaines de
+        # milliers). Chaque branche s'arrête après SEARCH_CANDIDATES
+        # lignes, puis seuls ces candidats sont classés :
+        # - préfixes : index b-tree lower(...) COLLATE "C"
+        #   (migration 6f3d1a9c8e27), parcourus dans l'ordre
+        # - sous-chaînes : index GIN gin_trgm_ops (migration
+        #   3b7e9c1d2a4f), si le terme est assez long
+        lower_prefix = func.lower(prefix)
+        branches = []
+        for field in (User.name, User.email):
+            lowered = func.lower(field).collate("C")
+            branches.append(
+                select(User.id)
+                .where(lowered.like(lower_prefix, escape="\\"))
+                .order_by(lowered)
+                .limit(SEARCH_CANDIDATES)
+            )
+            if len(term) >= MIN_TRIGRAM_LENGTH:
+                branches.append(
+                    select(User.id)
+                    .where(field.ilike(pattern, escape="\\"))
+                    .limit(SEARCH_CANDIDATES)
+                )
+        candidates = union(*branches).subquery()
+        query = query.join(candidates, User.id == candidates.c.id)
+        order_by.append(func.greatest(
+            func.similarity(User.name, term),
+            func.similarity(User.email, term),
+        ).desc())
+    elif len(term) < MIN_TRIGRAM_LENGTH:
+        # Terme trop court pour les trigrammes : on se limite aux
+        # préfixes, le LIMIT arrête le parcours au plus tôt
+        query = query.filter(is_prefix)
+    elif dialect == "sqlite" and sqlite_fts_ready():
+        # SQLite : la table FTS5 (tokenizer trigram) renvoie
+        # les rowid correspondants sans parcourir users
+        fts = table(SQLITE_FTS_TABLE, column("rowid"))
+        matching_ids = (
+            select(fts.c.rowid)
+            .where(text(f"{SQLITE_FTS_TABLE} MATCH :phrase"))
+        )
+        query = (query.filter(User.id.in_(matching_ids))
+                 .params(phrase=fts_phrase(term)))
+    else:
+        # Autres bases (ou SQLite sans FTS5) : simple ILIKE
+        query = query.filter(or_(User.name.ilike(pattern, escape="\\"),
+                                 User.email.ilike(pattern, escape="\\")))
+
+    order_by.append(User.id)
+    return query.order_by(*order_by).limit(limit).all()
+
+
+def update_user_role(db: Session, user_id: int, role: str,
+                     actor_id: int | None = None):
     user = db.query(User).filter(User.id == user_id).first()
     if user:
         try:
@@ -80,11 +205,49 @@ def update_user_role(db: Session, user_id: int, role: str):
             # Solution : utiliser setattr pour forcer
             # l'assignation de l'énumération
             # ✅ Correct pour SQLAlchemy et le linter
-            setattr(user, "role", UserRole(role))
+            old_role = user.role
+            new_role = UserRole(role)
+            setattr(user, "role", new_role)
         except ValueError:
             # Si le rôle n'est pas valide (ex: "superadmin"),
             # on ne modifie rien et on retourne None
             return None
+        if old_role != new_role:
+            deltas = {role_counter(new_role): 1}
+            if old_role is not None:
+                deltas[role_counter(old_role)] = -1
+            bump_user_counters(db, deltas)
         db.commit()
         db.refresh(user)
+        if old_role != new_role:
+            audit_writer.record(
+                "role_change",
+                user_id=user.id,
+                email=user.email,
+                actor_id=actor_id,
+                detail={"old": old_role.value if old_role else None,
+                        "new": new_role.value},
+            )
+    return user
+
+
+def update_user_active(db: Session, user_id: int, is_active: bool,
+                       actor_id: int | None = None):
+    # Active ou désactive un compte et met à jour les
+    # compteurs actifs / inactifs
+    user = db.query(User).filter(User.id == user_id).first()
+    if user:
+        was_active = user.is_active is not False
+        if was_active != is_active:
+            setattr(user, "is_active", is_active)
+            bump_user_counters(db, {active_counter(was_active): -1,
+                                    active_counter(is_active): 1})
+            db.commit()
+            db.refresh(user)
+            audit_writer.record(
+                "account_activated" if is_active else "account_deactivated",
+                user_id=user.id,
+                email=user.email,
+                actor_id=actor_id,
+            )
     return user
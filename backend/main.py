@@ -1,13 +1,113 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import Base, engine
+from starlette.concurrency import run_in_threadpool
+from config.settings import settings
+from crud.stats import reconcile_user_stats
+from database import Base, SessionLocal, engine
+from routers import audit
 from routers import auth
 from routers import users
+from routers import menu
+from routers import orders
+from routers import kitchen
+from utils.audit import audit_writer
+from utils.compression import CompressionMiddleware
+from utils.email_filter import email_filter
+from utils.http_cache import CacheControlMiddleware
+from utils.kitchen_hub import kitchen_hub, notify_orders_created
+from utils.menu_cache import menu_cache
+from utils.order_queue import create_order_consumer
+from utils.search import setup_sqlite_fts
+from utils.tasks import acquire_lease, run_periodically
+
 
+logger = logging.getLogger(__name__)
 
 Base.metadata.create_all(bind=engine)
+# Recherche locale (SQLite) : index FTS5 sur users.name / users.email
+setup_sqlite_fts(engine)
+
+
+def reconcile_stats_job():
+    # Recalcul périodique des compteurs de /admin/stats pour
+    # corriger une éventuelle dérive. Planifié dans chaque worker,
+    # mais le bail Redis ne laisse passer qu'une exécution par
+    # période pour tout le déploiement (redémarrages compris).
+    if not acquire_lease("user_stats_reconcile",
+                         settings.USER_STATS_RECONCILE_SECONDS):
+        return
+    db = SessionLocal()
+    try:
+        reconcile_user_stats(db)
+    finally:
+        db.close()
+
+
+def build_email_filter_job():
+    # Construction du filtre de Bloom des emails inscrits
+    # (lecture en flux de la table users)
+    db = SessionLocal()
+    try:
+        email_filter.build(db)
+    finally:
+        db.close()
+
+
+def check_email_filter_job():
+    # Filtre partagé désactivé (bits évincés, ajout en échec) :
+    # un seul worker le reconstruit grâce au bail, les autres
+    # se réactivent à la vérification suivante
+    if email_filter.refresh():
+        return
+    if not acquire_lease("email_filter_rebuild",
+                         settings.EMAIL_FILTER_CHECK_SECONDS):
+        return
+    logger.warning("Filtre des emails incomplet, reconstruction")
+    build_email_filter_job()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = []
+    audit_writer.start()
+    menu_cache.start()
+    await kitchen_hub.start()
+    # Worker d'enregistrement des commandes (file Redis → base)
+    order_consumer = None
+    if settings.ORDERS_WORKER_ENABLED:
+        order_consumer = create_order_consumer(
+            on_persisted=notify_orders_created)
+    if order_consumer is not None:
+        order_consumer.start()
+    if email_filter.enabled:
+        # En tâche de fond : le démarrage n'attend pas la fin de
+        # la lecture ; d'ici là le filtre répond "peut-être"
+        tasks.append(asyncio.create_task(
+            run_in_threadpool(build_email_filter_job)))
+    if email_filter.backend == "redis" and email_filter.enabled:
+        tasks.append(asyncio.create_task(run_periodically(
+            settings.EMAIL_FILTER_CHECK_SECONDS, check_email_filter_job,
+            delay=settings.EMAIL_FILTER_CHECK_SECONDS)))
+    if settings.USER_STATS_RECONCILE_SECONDS > 0:
+        tasks.append(asyncio.create_task(run_periodically(
+            settings.USER_STATS_RECONCILE_SECONDS, reconcile_stats_job)))
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if order_consumer is not None:
+        await run_in_threadpool(order_consumer.stop)
+    await kitchen_hub.stop()
+    await run_in_threadpool(menu_cache.stop)
+    # Écrit les derniers événements d'audit avant de quitter
+    await run_in_threadpool(audit_writer.stop)
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Configuration CORS
 app.add_middleware(
@@ -18,10 +118,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Cache-Control par défaut selon la route (utils/http_cache.py)
+app.add_middleware(CacheControlMiddleware)
+
+# Compression gzip / brotli / zstd des réponses JSON et des exports
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    levels={
+        "gzip": settings.COMPRESSION_GZIP_LEVEL,
+        "br": settings.COMPRESSION_BROTLI_LEVEL,
+        "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+    },
+)
+
 
 # inclusion d'une route de test
 app.include_router(auth.router)
 app.include_router(users.router)
+app.include_router(audit.router)
+app.include_router(menu.router)
+app.include_router(orders.router)
+app.include_router(kitchen.router)
 
 
 @app.get("/")
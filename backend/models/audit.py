@@ -0,0 +1,39 @@
+# models/audit.py
+
+# Journal d'audit : connexions réussies / échouées, changements
+# de rôle ou d'activation. Les lignes sont écrites par lots par
+# utils/audit.py, jamais dans la transaction de la requête.
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Integer, String
+from database import Base
+
+from datetime import datetime
+
+
+class AuditEvent(Base):
+    __tablename__ = "audit_events"
+
+    # BigInteger sous PostgreSQL (table à fort volume), Integer
+    # sous SQLite pour garder l'auto-incrément du rowid
+    id = Column(BigInteger().with_variant(Integer, "sqlite"),
+                primary_key=True, autoincrement=True)
+
+    # Type d'événement : "login_success", "login_failure",
+    # "role_change", "account_activated", "account_deactivated"
+    event_type = Column(String, nullable=False, index=True)
+
+    # Utilisateur concerné (None si l'email est inconnu)
+    user_id = Column(Integer, nullable=True, index=True)
+
+    # Email saisi ou de l'utilisateur concerné
+    email = Column(String, nullable=True)
+
+    # Auteur de l'action (ex: l'admin qui change un rôle)
+    actor_id = Column(Integer, nullable=True)
+
+    # Adresse IP du client
+    ip = Column(String, nullable=True)
+
+    # Informations complémentaires (ex: ancien / nouveau rôle)
+    detail = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,34 @@
+# models/menu.py
+
+# Carte du restaurant : un plat / une boisson par ligne.
+# Les lectures publiques passent par utils/menu_cache.py, la
+# table n'est interrogée qu'après une modification.
+from sqlalchemy import Boolean, Column, DateTime, Integer, Numeric, String
+from database import Base
+
+from datetime import datetime
+
+
+class MenuItem(Base):
+    __tablename__ = "menu_items"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+
+    name = Column(String, nullable=False)
+
+    description = Column(String, nullable=True)
+
+    # Prix (en FCFA), renvoyé en float par SQLAlchemy
+    price = Column(Numeric(10, 2, asdecimal=False), nullable=False)
+
+    # Catégorie libre : "entrée", "plat", "dessert", "boisson"...
+    category = Column(String, nullable=False, index=True)
+
+    # Un plat en rupture reste sur la carte mais n'est plus
+    # commandable
+    is_available = Column(Boolean, default=True, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    updated_at = Column(DateTime, default=datetime.utcnow,
+                        onupdate=datetime.utcnow)
@@ -0,0 +1,72 @@
+# models/order.py
+
+# Commandes des clients. Elles ne sont pas écrites par la route
+# POST /orders : la route les met dans un flux Redis et
+# utils/order_queue.py les enregistre ici par lots.
+from sqlalchemy import Enum as SqlEnum
+from sqlalchemy import (Column, DateTime, ForeignKey, Integer, Numeric,
+                        String)
+from sqlalchemy.orm import relationship
+from database import Base
+
+from datetime import datetime
+
+import enum
+
+
+class OrderStatus(enum.Enum):
+    # Enregistrée en base, en attente de la cuisine
+    received = "received"
+    preparing = "preparing"
+    ready = "ready"
+    served = "served"
+    cancelled = "cancelled"
+
+
+class Order(Base):
+    __tablename__ = "orders"
+
+    # UUID généré à la réception de la commande : il est renvoyé
+    # au client avant même l'écriture en base, et sert de clé
+    # d'idempotence si le worker rejoue un message
+    id = Column(String(36), primary_key=True)
+
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False,
+                     index=True)
+
+    status = Column(SqlEnum(OrderStatus), default=OrderStatus.received,
+                    nullable=False, index=True)
+
+    # Total calculé avec les prix de la carte au moment de la commande
+    total = Column(Numeric(10, 2, asdecimal=False), nullable=False)
+
+    note = Column(String, nullable=True)
+
+    # Date de passage de la commande (pas de l'écriture en base)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow,
+                        onupdate=datetime.utcnow)
+
+    # Lignes de la commande, chargées en une requête IN (...)
+    items = relationship("OrderItem", lazy="selectin")
+
+
+class OrderItem(Base):
+    __tablename__ = "order_items"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    order_id = Column(String(36), ForeignKey("orders.id"), nullable=False,
+                      index=True)
+
+    # Pas de clé étrangère vers menu_items : un plat retiré de la
+    # carte ne doit pas casser l'historique. Nom et prix sont
+    # recopiés au moment de la commande.
+    menu_item_id = Column(Integer, nullable=False)
+
+    name = Column(String, nullable=False)
+
+    unit_price = Column(Numeric(10, 2, asdecimal=False), nullable=False)
+
+    quantity = Column(Integer, nullable=False)
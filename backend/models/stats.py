@@ -0,0 +1,26 @@
+# models/stats.py
+
+# Tables de compteurs pour les statistiques utilisateurs
+# (/admin/stats). Elles sont mises à jour de façon incrémentale
+# par crud/user.py dans la même transaction que la modification
+# des utilisateurs, et recalculées périodiquement par
+# crud.stats.reconcile_user_stats pour corriger toute dérive.
+from sqlalchemy import BigInteger, Column, Date, String
+from database import Base
+
+
+# 1. Compteurs globaux, une ligne par compteur :
+# "role:client", "role:staff", "role:admin", "active", "inactive"
+class UserStatCounter(Base):
+    __tablename__ = "user_stat_counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+
+# 2. Nombre d'inscriptions par jour (date de created_at)
+class UserSignupDaily(Base):
+    __tablename__ = "user_signups_daily"
+
+    day = Column(Date, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
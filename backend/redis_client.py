@@ -1,9 +1,21 @@
+# redis_client.py
 
 import redis
 
-# Connexion à Redis via le nom du service Docker (redis)
-r = redis.redis(host="redis", port=6379, decode_responses=True)
+from config.settings import settings
 
-
-r.set("yo", "nkm")
-print(r.get("yo"))
+# Connexion à Redis via le nom du service Docker (redis),
+# configurée par REDIS_URL. La connexion est ouverte à la
+# première commande ; `r` vaut None si REDIS_URL est vide.
+r = (
+    redis.Redis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        # Timeouts courts : Redis est un accélérateur, une panne
+        # ne doit pas bloquer les requêtes
+        socket_connect_timeout=1,
+        socket_timeout=1,
+    )
+    if settings.REDIS_URL
+    else None
+)
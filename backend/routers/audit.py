@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from database import get_db
+from schemas.audit import AuditEventOut, AuditWriterStats
+from utils.audit import audit_writer
+from utils.security import is_admin
+from crud import audit as crud_audit
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"]
+)
+
+
+@router.get("/audit-events", response_model=list[AuditEventOut])
+def get_audit_events(limit: int = Query(100, ge=1, le=1000),
+                     event_type: str | None = None,
+                     user_id: int | None = None,
+                     db: Session = Depends(get_db),
+                     _=Depends(is_admin)):
+    return crud_audit.get_audit_events(db, limit, event_type, user_id)
+
+
+@router.get("/audit-events/stats", response_model=AuditWriterStats)
+def get_audit_writer_stats(_=Depends(is_admin)):
+    # Compteurs du processus courant (tampon, écrits, abandonnés)
+    return audit_writer.stats()
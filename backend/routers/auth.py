@@ -2,7 +2,7 @@
 
 # 📦 Importation de FastAPI pour créer
 # les routes, gérer les erreurs et dépendances
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 # 🔐 Importation d'un formulaire de type OAuth2
 # (utilisé pour récupérer email et mot de passe)
@@ -20,7 +20,14 @@ from database import get_db
 # colonnes de la table users)
 
 # 🔐 Fonctions de sécurité personnalisées
-from utils.security import verify_password, create_access_token, is_admin
+from utils.security import (verify_password, fake_verify_password,
+                            create_access_token, is_admin)
+
+# 🧮 Filtre de Bloom des emails inscrits
+from utils.email_filter import EmailFilterUnavailable, email_filter
+
+# 📝 Journal d'audit (écriture en tâche de fond, non bloquante)
+from utils.audit import audit_writer
 
 # Importation des schémas d'entrée
 # (UserCreate) et de sortie (UserOut)
@@ -29,6 +36,7 @@ from schemas.user import UserCreate, UserOut
 # Importation des fonctions CRUD définies
 # pour les utilisateurs
 from crud import user as crud_user
+from crud.auth import get_auth_user_by_email
 
 from schemas.token import TokenResponse
 
@@ -51,12 +59,23 @@ router = APIRouter()
 # injectée automatiquement
 @router.post("/token", response_model=TokenResponse)
 def login(
+        request: Request,
         form_data: OAuth2PasswordRequestForm = Depends(),
         db: Session = Depends(get_db)):
 
     # 🔎 On cherche l'utilisateur en base via son
     # email (form_data.username contient l'email)
-    user = crud_user.get_user_by_email(db, form_data.username)
+    # 🧮 Si le filtre de Bloom sait que l'email n'a jamais été
+    # inscrit, on n'interroge pas la base du tout
+    user = None
+    if email_filter.might_exist(form_data.username):
+        user = get_auth_user_by_email(db, form_data.username)
+
+    # 🕵️ Utilisateur inconnu : on calcule quand même un hash
+    # bcrypt factice pour que le temps de réponse soit le même
+    # que pour un mauvais mot de passe
+    if not user:
+        fake_verify_password(form_data.password)
 
     # ❌ Si l'utilisateur n'existe pas OU que le
     # mot de passe est incorrect :
@@ -68,6 +87,13 @@ def login(
     # user.hashed_password)   # ceci passe la valeur du hash
     if not user or not verify_password(form_data.password,
                                        user.hashed_password):
+        # 📝 Tentative échouée (email inconnu ou mauvais mot de passe)
+        audit_writer.record(
+            "login_failure",
+            user_id=user.id if user else None,
+            email=form_data.username,
+            ip=request.client.host if request.client else None,
+        )
         # 👉 On lève une exception HTTP 401 (Unauthorized)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -76,15 +102,37 @@ def login(
             # Indique que l'authentification est requise
             headers={"WWW-Athenticate": "Bearer"},
         )
+    # 🚫 Compte désactivé par un admin : bon mot de passe, mais
+    # pas de token (is_active NULL compte comme actif)
+    if user.is_active is False:
+        audit_writer.record(
+            "login_failure",
+            user_id=user.id,
+            email=user.email,
+            ip=request.client.host if request.client else None,
+            detail={"reason": "inactive"},
+        )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Compte désactivé",
+        )
     # ✅ L'utilisateur est authentifié → on
     # peut lui créer un token JWT
     # Le token contiendra :
     # - "sub" : identifiant principal du
     # token (ici l'email, mais ça pourrait être l'ID)
+    # - "uid" : id de l'utilisateur, pour les routes qui
+    # s'authentifient sans requête SQL (passage de commande)
     # - "role" : utile si on veut faire des
     # autorisations par rôle (admin/client/...)
     access_token = create_access_token(
-        data={"sub": user.email, "role": user.role.value}
+        data={"sub": user.email, "uid": user.id, "role": user.role.value}
+    )
+    audit_writer.record(
+        "login_success",
+        user_id=user.id,
+        email=user.email,
+        ip=request.client.host if request.client else None,
     )
     # 🔁 On retourne le token sous forme
     # de dictionnaire JSON
@@ -119,7 +167,10 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     # requêtes et manipuler la DB dans ce contexte.
 
     # Vérifie si un utilisateur existe déjà avec cet email
-    db_user = crud_user.get_user_by_email(db, user.email)
+    # (inutile si le filtre de Bloom sait qu'il est inconnu)
+    db_user = None
+    if email_filter.might_exist(user.email):
+        db_user = get_auth_user_by_email(db, user.email)
     # Appel à la fonction CRUD qui interroge la
     # DB pour trouver un utilisateur avec cet email.
     # Important : cette vérification évite la création
@@ -139,7 +190,13 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
 
     # Si l'email n'existe pas encore en DB, on
     # procède à la création du nouvel utilisateur
-    return crud_user.create_user(db, user)
+    try:
+        return crud_user.create_user(db, user)
+    except EmailFilterUnavailable:
+        # Redis en panne : réessayer plus tard (voir
+        # utils/email_filter.py)
+        raise HTTPException(status_code=503,
+                            detail="Service temporairement indisponible")
     # On appelle la fonction de création utilisateur
     # définie dans le CRUD.
     # Cette fonction va :
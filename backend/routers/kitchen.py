@@ -0,0 +1,109 @@
+# routers/kitchen.py
+
+# Flux temps réel des commandes pour les écrans cuisine.
+# - WebSocket /kitchen/ws?token=<JWT> (les navigateurs ne
+#   peuvent pas envoyer de header Authorization en WebSocket)
+# - SSE /kitchen/events (repli si le WebSocket est bloqué par
+#   un proxy), authentifié par le header Authorization habituel
+import asyncio
+
+from fastapi import (APIRouter, Depends, HTTPException, Query, Request,
+                     WebSocket, WebSocketDisconnect)
+from fastapi.responses import StreamingResponse
+from database import SessionLocal
+from config.settings import settings
+from utils.kitchen_hub import kitchen_hub
+from utils.security import get_user_from_token, is_staff, oauth2_scheme
+
+router = APIRouter(
+    prefix="/kitchen",
+    tags=["kitchen"]
+)
+
+# Intervalle des commentaires "keep-alive" SSE (les proxies
+# coupent les connexions HTTP muettes)
+SSE_HEARTBEAT_SECONDS = 15.0
+
+
+def _authorize_token(token: str):
+    # Même contrôle que Depends(is_staff) : JWT valide et rôle
+    # "staff". La session est fermée tout de suite pour ne pas
+    # garder une connexion SQL pendant toute la durée du flux
+    # (WebSocket ou SSE) : Depends(get_db) ne serait libéré qu'à
+    # la fin de la réponse.
+    db = SessionLocal()
+    try:
+        return is_staff(get_user_from_token(token, db))
+    finally:
+        db.close()
+
+
+async def _send_loop(websocket: WebSocket, subscriber):
+    while True:
+        message = await subscriber.queue.get()
+        if message is None:
+            # Écran trop lent (file pleine) ou arrêt du serveur
+            await websocket.close(code=1013 if subscriber.evicted
+                                  else 1001)
+            return
+        await asyncio.wait_for(websocket.send_text(message),
+                               settings.KITCHEN_SEND_TIMEOUT_SECONDS)
+
+
+@router.websocket("/ws")
+async def kitchen_websocket(websocket: WebSocket, token: str = Query(...)):
+    try:
+        await asyncio.to_thread(_authorize_token, token)
+    except HTTPException:
+        # 1008 : violation de politique (token invalide / rôle)
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    subscriber = kitchen_hub.subscribe()
+    sender = asyncio.create_task(_send_loop(websocket, subscriber))
+    try:
+        # Les écrans n'envoient rien : on lit seulement pour
+        # détecter la déconnexion
+        while not sender.done():
+            receive = asyncio.ensure_future(websocket.receive())
+            await asyncio.wait({receive, sender},
+                               return_when=asyncio.FIRST_COMPLETED)
+            if not receive.done():
+                receive.cancel()
+                break
+            if receive.result()["type"] == "websocket.disconnect":
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        kitchen_hub.unsubscribe(subscriber)
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+
+
+@router.get("/events")
+async def kitchen_events(request: Request,
+                         token: str = Depends(oauth2_scheme)):
+    await asyncio.to_thread(_authorize_token, token)
+    subscriber = kitchen_hub.subscribe()
+
+    async def stream():
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        subscriber.queue.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": ping\n\n"
+                    continue
+                if message is None:
+                    return
+                yield f"data: {message}\n\n"
+        finally:
+            kitchen_hub.unsubscribe(subscriber)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache",
+                                      "X-Accel-Buffering": "no"})
@@ -0,0 +1,73 @@
+# routers/menu.py
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from database import get_db
+from schemas.menu import MenuItemCreate, MenuItemOut, MenuItemUpdate
+from utils.compression import accepts_encoding
+from utils.menu_cache import etag_matches, menu_cache
+from utils.security import is_staff_or_admin
+from crud import menu as crud_menu
+
+router = APIRouter(
+    prefix="/menu",
+    tags=["menu"]
+)
+
+# Le navigateur / CDN peut garder la carte mais doit la
+# revalider (If-None-Match → 304) avant de la réutiliser
+MENU_CACHE_CONTROL = "public, no-cache"
+
+
+@router.get("", response_model=list[MenuItemOut])
+def read_menu(request: Request, db: Session = Depends(get_db)):
+    # Carte publique servie depuis le cache (octets JSON déjà
+    # sérialisés et compressés) : la base n'est lue qu'après
+    # une modification de la carte
+    entry = menu_cache.get(db)
+    # Chaque encodage a son propre ETag fort
+    gzip = accepts_encoding(request.headers.get("accept-encoding"), "gzip")
+    headers = {
+        "ETag": entry.gzip_etag if gzip else entry.etag,
+        "Cache-Control": MENU_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(entry.gzip_body, media_type="application/json",
+                        headers=headers)
+    return Response(entry.body, media_type="application/json",
+                    headers=headers)
+
+
+@router.post("/items", response_model=MenuItemOut, status_code=201)
+def create_item(item: MenuItemCreate,
+                db: Session = Depends(get_db),
+                _=Depends(is_staff_or_admin)):
+    db_item = crud_menu.create_menu_item(db, item)
+    menu_cache.invalidate()
+    return db_item
+
+
+@router.put("/items/{item_id}", response_model=MenuItemOut)
+def update_item(item_id: int,
+                data: MenuItemUpdate,
+                db: Session = Depends(get_db),
+                _=Depends(is_staff_or_admin)):
+    db_item = crud_menu.update_menu_item(db, item_id, data)
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Plat introuvable")
+    menu_cache.invalidate()
+    return db_item
+
+
+@router.delete("/items/{item_id}", status_code=204)
+def delete_item(item_id: int,
+                db: Session = Depends(get_db),
+                _=Depends(is_staff_or_admin)):
+    if not crud_menu.delete_menu_item(db, item_id):
+        raise HTTPException(status_code=404, detail="Plat introuvable")
+    menu_cache.invalidate()
+    return Response(status_code=204)
@@ -0,0 +1,83 @@
+# routers/orders.py
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from database import get_db
+from crud.auth import AuthUser
+from schemas.order import (OrderAccepted, OrderCreate, OrderOut,
+                           UpdateOrderStatus)
+from utils.kitchen_hub import kitchen_hub
+from utils.menu_cache import menu_cache
+from utils.order_queue import OrderQueueUnavailable, enqueue_order
+from utils.security import (TokenUser, get_current_user, is_client_token,
+                            is_staff_or_admin)
+from crud import order as crud_order
+
+router = APIRouter(
+    prefix="/orders",
+    tags=["orders"]
+)
+
+
+@router.post("", response_model=OrderAccepted,
+             status_code=status.HTTP_202_ACCEPTED)
+def submit_order(order: OrderCreate,
+                 db: Session = Depends(get_db),
+                 current_user: TokenUser = Depends(is_client_token)):
+    # Client identifié par son token, validation avec la carte en
+    # cache (pas de requête SQL tant que la carte n'a pas changé),
+    # puis ajout dans la file Redis : l'écriture en base est faite
+    # par le worker
+    menu = {item["id"]: item for item in menu_cache.get(db).items}
+    items = []
+    for line in order.items:
+        menu_item = menu.get(line.menu_item_id)
+        if menu_item is None or not menu_item["is_available"]:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Plat {line.menu_item_id} indisponible",
+            )
+        items.append({
+            "menu_item_id": menu_item["id"],
+            "name": menu_item["name"],
+            "unit_price": menu_item["price"],
+            "quantity": line.quantity,
+        })
+    total = round(sum(item["unit_price"] * item["quantity"]
+                      for item in items), 2)
+    try:
+        order_id = enqueue_order(current_user.id, items, total, order.note)
+    except OrderQueueUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Commandes momentanément indisponibles",
+        )
+    return {"id": order_id, "status": "queued", "total": total}
+
+
+@router.get("/{order_id}", response_model=OrderOut)
+def read_order(order_id: str,
+               db: Session = Depends(get_db),
+               current_user: AuthUser = Depends(get_current_user)):
+    order = crud_order.get_order(db, order_id)
+    # 404 aussi tant que le worker n'a pas enregistré la commande
+    if not order:
+        raise HTTPException(status_code=404, detail="Commande introuvable")
+    if (order.user_id != current_user.id
+            and current_user.role.value not in ("staff", "admin")):
+        raise HTTPException(status_code=403, detail="Accés interdit")
+    return order
+
+
+@router.put("/{order_id}/status", response_model=OrderOut)
+def change_order_status(order_id: str,
+                        data: UpdateOrderStatus,
+                        db: Session = Depends(get_db),
+                        _=Depends(is_staff_or_admin)):
+    order = crud_order.update_order_status(db, order_id, data.status.value)
+    if not order:
+        raise HTTPException(status_code=404, detail="Commande introuvable")
+    # Les écrans cuisine sont prévenus en temps réel
+    kitchen_hub.publish({"type": "order_status", "order_id": order.id,
+                         "status": order.status.value})
+    return order
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+import csv
+import io
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from database import get_db
-from schemas.user import UserOut, UpdateRole
-from utils.security import is_admin
+from database import SessionLocal, get_db
+from crud.auth import AuthUser
+from schemas.user import UserOut, UpdateRole, UpdateActive, UserStatsOut
+from utils.security import get_user_from_token, is_admin, oauth2_scheme
 from crud import user as crud_user
+from crud import stats as crud_stats
 
 router = APIRouter(
     prefix="/admin",
@@ -12,16 +18,99 @@ router = APIRouter(
 
 
 @router.get("/users", response_model=list[UserOut])
-def get_users(db: Session = Depends(get_db), _=Depends(is_admin)):
-    return crud_user.get_all_users(db)
+def get_users(q: str | None = Query(None, max_length=100),
+              limit: int = Query(20, ge=1, le=100),
+              db: Session = Depends(get_db), _=Depends(is_admin)):
+    # Sans "q" : liste complète (comportement historique)
+    # Avec "q" : recherche indexée par nom/email, limitée à "limit"
+    if q is None or not q.strip():
+        return crud_user.get_all_users(db)
+    return crud_user.search_users(db, q, limit)
+
+
+def _authorize_admin(token: str):
+    # Même contrôle que Depends(is_admin), avec une session fermée
+    # tout de suite : Depends(get_db) garderait sa connexion SQL
+    # jusqu'à la fin de l'export (voir routers/kitchen.py)
+    db = SessionLocal()
+    try:
+        return is_admin(get_user_from_token(token, db))
+    finally:
+        db.close()
+
+
+@router.get("/users/export")
+def export_users(token: str = Depends(oauth2_scheme)):
+    # Export CSV en streaming : envoyé (et compressé) par morceaux
+    # au fur et à mesure de la lecture de la table
+    _authorize_admin(token)
+
+    def rows():
+        # Session propre au générateur : elle doit rester ouverte
+        # jusqu'au dernier morceau envoyé
+        db = SessionLocal()
+        try:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(["id", "name", "email", "role", "created_at",
+                             "is_active"])
+            for count, user in enumerate(crud_user.iter_users(db), 1):
+                writer.writerow([user.id, user.name, user.email,
+                                 user.role.value if user.role else "",
+                                 user.created_at.isoformat()
+                                 if user.created_at else "",
+                                 user.is_active])
+                if count % 1000 == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        rows(), media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="users.csv"'},
+    )
 
 
 @router.put("/users/{user_id}/role", response_model=UserOut)
 def change_user_role(user_id: int,
                      data: UpdateRole,
                      db: Session = Depends(get_db),
-                     _: str = Depends(is_admin)):
-    user = crud_user.update_user_role(db, user_id, data.role)
+                     admin: AuthUser = Depends(is_admin)):
+    user = crud_user.update_user_role(db, user_id, data.role,
+                                      actor_id=admin.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="Utilisateur introuvable")
+    return user
+
+
+@router.put("/users/{user_id}/active", response_model=UserOut)
+def change_user_active(user_id: int,
+                       data: UpdateActive,
+                       db: Session = Depends(get_db),
+                       admin: AuthUser = Depends(is_admin)):
+    user = crud_user.update_user_active(db, user_id, data.is_active,
+                                        actor_id=admin.id)
     if not user:
         raise HTTPException(status_code=404, detail="Utilisateur introuvable")
     return user
+
+
+@router.get("/stats", response_model=UserStatsOut)
+def get_stats(days: int = Query(30, ge=1, le=366),
+              db: Session = Depends(get_db),
+              _=Depends(is_admin)):
+    # Lit les compteurs maintenus par crud/user.py :
+    # aucun COUNT(*) sur la table users
+    return crud_stats.get_user_stats(db, days)
+
+
+@router.post("/stats/reconcile", response_model=UserStatsOut)
+def reconcile_stats(db: Session = Depends(get_db), _=Depends(is_admin)):
+    # Force le recalcul (normalement fait périodiquement)
+    if not crud_stats.reconcile_user_stats(db):
+        raise HTTPException(status_code=409,
+                            detail="Recalcul déjà en cours")
+    return crud_stats.get_user_stats(db)
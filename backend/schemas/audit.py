@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class AuditEventOut(BaseModel):
+    id: int
+    event_type: str
+    user_id: int | None
+    email: str | None
+    actor_id: int | None
+    ip: str | None
+    detail: dict | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# Compteurs du writer d'audit (utils/audit.py)
+class AuditWriterStats(BaseModel):
+    pending: int
+    capacity: int
+    enqueued: int
+    written: int
+    dropped: int
+    failed: int
+    batches: int
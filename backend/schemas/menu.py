@@ -0,0 +1,36 @@
+# schemas/menu.py
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+# Création d'un plat (staff / admin)
+class MenuItemCreate(BaseModel):
+    name: str = Field(min_length=1, max_length=120)
+    description: str | None = Field(None, max_length=1000)
+    price: float = Field(gt=0)
+    category: str = Field(min_length=1, max_length=60)
+    is_available: bool = True
+
+
+# Modification partielle : seuls les champs envoyés changent
+class MenuItemUpdate(BaseModel):
+    name: str | None = Field(None, min_length=1, max_length=120)
+    description: str | None = Field(None, max_length=1000)
+    price: float | None = Field(None, gt=0)
+    category: str | None = Field(None, min_length=1, max_length=60)
+    is_available: bool | None = None
+
+
+class MenuItemOut(BaseModel):
+    id: int
+    name: str
+    description: str | None
+    price: float
+    category: str
+    is_available: bool
+    updated_at: datetime | None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,62 @@
+# schemas/order.py
+
+from datetime import datetime
+from enum import Enum
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+# Même valeurs que models.order.OrderStatus
+class OrderStatus(str, Enum):
+    received = "received"
+    preparing = "preparing"
+    ready = "ready"
+    served = "served"
+    cancelled = "cancelled"
+
+
+class OrderItemIn(BaseModel):
+    menu_item_id: int
+    quantity: int = Field(ge=1, le=50)
+
+
+# Commande envoyée par un client
+class OrderCreate(BaseModel):
+    items: list[OrderItemIn] = Field(min_length=1, max_length=50)
+    note: str | None = Field(None, max_length=500)
+
+
+# Réponse immédiate de POST /orders : la commande est dans la
+# file, elle sera enregistrée en base par le worker
+class OrderAccepted(BaseModel):
+    id: str
+    status: Literal["queued"] = "queued"
+    total: float
+
+
+class OrderItemOut(BaseModel):
+    menu_item_id: int
+    name: str
+    unit_price: float
+    quantity: int
+
+    class Config:
+        from_attributes = True
+
+
+class OrderOut(BaseModel):
+    id: str
+    user_id: int
+    status: OrderStatus
+    total: float
+    note: str | None
+    created_at: datetime
+    items: list[OrderItemOut]
+
+    class Config:
+        from_attributes = True
+
+
+class UpdateOrderStatus(BaseModel):
+    status: OrderStatus
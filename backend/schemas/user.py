@@ -13,7 +13,7 @@ from typing import Literal
 from enum import Enum
 
 # Importation de datetime pour gérer la date de création
-from datetime import datetime
+from datetime import date, datetime
 
 # 1. Définition d'une énumération (Enum) pour
 # les rôles, identique à celle du modèle SQLAlchemy
@@ -60,3 +60,22 @@ class UserOut(BaseModel):
 
 class UpdateRole(BaseModel):
     role: Literal["client", "staff", "admin"]
+
+
+class UpdateActive(BaseModel):
+    is_active: bool
+
+
+# Statistiques utilisateurs (/admin/stats)
+class DailySignups(BaseModel):
+    day: date
+    count: int
+
+
+class UserStatsOut(BaseModel):
+    # Nombre d'utilisateurs par rôle ({"client": 12, ...})
+    roles: dict[str, int]
+    active: int
+    inactive: int
+    # Inscriptions par jour, du plus ancien au plus récent
+    signups_per_day: list[DailySignups]
@@ -0,0 +1,210 @@
+# tests/conftest.py
+
+# Fixtures communes des tests : chaque test tourne dans une
+# transaction annulée à la fin, sur une base propre au worker
+# pytest-xdist, sans Redis ni service externe.
+# - SQLite (par défaut) : le schéma est créé une seule fois dans
+#   un fichier modèle, copié ensuite pour chaque worker
+# - PostgreSQL : définir TEST_DATABASE_URL ; une base modèle est
+#   migrée avec Alembic puis clonée (CREATE DATABASE ... TEMPLATE)
+# Le modèle est reconstruit automatiquement quand le schéma change.
+# Usage (depuis le dossier backend) :
+#   python -m pytest -n auto
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+# "gw0", "gw1"... sous xdist, "main" sinon
+WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")
+RUN_ID = os.environ.get("PYTEST_XDIST_TESTRUNUID", str(os.getpid()))[:12]
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "")
+TMP_DIR = Path(tempfile.gettempdir()) / "restaurant-tests"
+
+# Clé du verrou PostgreSQL qui sérialise la création du modèle
+TEMPLATE_LOCK_KEY = 726_351_840
+
+
+def _worker_database_url() -> str:
+    if TEST_DATABASE_URL:
+        from sqlalchemy.engine import make_url
+        url = make_url(TEST_DATABASE_URL)
+        return url.set(database=f"{url.database}_{WORKER}").render_as_string(
+            hide_password=False)
+    TMP_DIR.mkdir(exist_ok=True)
+    return f"sqlite:///{TMP_DIR / f'test-{RUN_ID}-{WORKER}.db'}"
+
+
+# La configuration doit être en place avant le premier import de
+# config.settings (database.py crée l'engine à l'import)
+os.environ.update({
+    "DATABASE_URL": _worker_database_url(),
+    "SECRET_KEY": "test-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "REDIS_URL": "",
+    "EMAIL_FILTER_BACKEND": "off",
+    "ORDERS_WORKER_ENABLED": "false",
+    "USER_STATS_RECONCILE_SECONDS": "0",
+})
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, event, text  # noqa: E402
+from sqlalchemy.engine import make_url  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+from sqlalchemy.schema import CreateIndex, CreateTable  # noqa: E402
+
+import models.audit  # noqa: E402,F401
+import models.menu  # noqa: E402,F401
+import models.order  # noqa: E402,F401
+import models.stats  # noqa: E402,F401
+import models.user  # noqa: E402,F401
+from database import Base, SessionLocal, engine, get_db  # noqa: E402
+from utils.search import setup_sqlite_fts  # noqa: E402
+
+
+def _schema_fingerprint(dialect) -> str:
+    # Change dès qu'une table, un index ou une migration change
+    digest = hashlib.sha1()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect))
+                      .encode())
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect))
+                          .encode())
+    for migration in sorted((BACKEND_DIR / "alembic" / "versions")
+                            .glob("*.py")):
+        digest.update(migration.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def _prepare_sqlite(target: Path):
+    template = TMP_DIR / f"template-{_schema_fingerprint(engine.dialect)}.db"
+    if not template.exists():
+        # Construit à part puis renommé (atomique) : plusieurs
+        # workers peuvent le faire en même temps sans se gêner
+        building = TMP_DIR / f"template-{os.getpid()}.tmp"
+        template_engine = create_engine(f"sqlite:///{building}",
+                                        poolclass=NullPool)
+        Base.metadata.create_all(template_engine)
+        setup_sqlite_fts(template_engine)
+        template_engine.dispose()
+        os.replace(building, template)
+    shutil.copyfile(template, target)
+
+
+def _migrate_postgres(url):
+    from alembic import command
+    from alembic.config import Config
+
+    # Comme en production : la table users vient du create_all
+    # historique de main.py (migration initiale vide), le reste
+    # des migrations
+    template_engine = create_engine(url, poolclass=NullPool)
+    models.user.User.__table__.create(template_engine)
+    template_engine.dispose()
+
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    config.set_main_option("sqlalchemy.url", url.render_as_string(
+        hide_password=False).replace("%", "%%"))
+    command.upgrade(config, "head")
+
+
+def _prepare_postgres(target_url):
+    template = (f"{make_url(TEST_DATABASE_URL).database}_template_"
+                f"{_schema_fingerprint(engine.dialect)}")
+    admin = create_engine(target_url.set(database="postgres"),
+                          isolation_level="AUTOCOMMIT", poolclass=NullPool)
+    with admin.connect() as conn:
+        # Un seul worker à la fois construit le modèle ou le clone
+        conn.execute(text("SELECT pg_advisory_lock(:key)"),
+                     {"key": TEMPLATE_LOCK_KEY})
+        try:
+            exists = conn.execute(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                {"name": template}).scalar()
+            if not exists:
+                conn.execute(text(f'CREATE DATABASE "{template}"'))
+                try:
+                    _migrate_postgres(target_url.set(database=template))
+                except Exception:
+                    conn.execute(text(f'DROP DATABASE "{template}"'))
+                    raise
+            conn.execute(text(
+                f'DROP DATABASE IF EXISTS "{target_url.database}"'))
+            conn.execute(text(f'CREATE DATABASE "{target_url.database}" '
+                              f'TEMPLATE "{template}"'))
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"),
+                         {"key": TEMPLATE_LOCK_KEY})
+    admin.dispose()
+
+
+if engine.dialect.name == "sqlite":
+    _prepare_sqlite(Path(engine.url.database))
+
+    # pysqlite ouvre les transactions lui-même (et mal avec les
+    # SAVEPOINT) : on le laisse en autocommit et SQLAlchemy émet
+    # BEGIN, pour que le rollback de fin de test annule tout
+    @event.listens_for(engine, "connect")
+    def _sqlite_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _sqlite_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+else:
+    _prepare_postgres(engine.url)
+
+# Importé après la préparation de la base : le create_all de
+# main.py ne trouve plus rien à créer
+from main import app  # noqa: E402
+from utils.menu_cache import menu_cache  # noqa: E402
+
+
+def pytest_unconfigure(config):
+    engine.dispose()
+    if engine.dialect.name == "sqlite":
+        Path(engine.url.database).unlink(missing_ok=True)
+
+
+@pytest.fixture
+def db():
+    # Une connexion et une transaction par test, annulée à la fin.
+    # Les commit() du code testé ne libèrent qu'un SAVEPOINT.
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Les sessions ouvertes directement par le code (export CSV,
+    # tâches) rejoignent la même transaction
+    session_options = dict(SessionLocal.kw)
+    SessionLocal.configure(bind=connection,
+                           join_transaction_mode="create_savepoint")
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        SessionLocal.kw.clear()
+        SessionLocal.kw.update(session_options)
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def client(db):
+    # Sans "with" : le lifespan (threads d'audit, Redis, worker de
+    # commandes) n'est pas démarré
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        # Le cache du menu survivrait sinon au rollback
+        menu_cache.drop()
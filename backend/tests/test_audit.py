@@ -0,0 +1,156 @@
+import threading
+
+from sqlalchemy import select
+
+from database import SessionLocal
+from models.audit import AuditEvent
+from utils.audit import AuditWriter
+
+
+class _BrokenSession:
+    # Base indisponible : chaque écriture échoue
+    def execute(self, *args, **kwargs):
+        raise RuntimeError("base indisponible")
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _flaky(failures: int):
+    # Les "failures" premières sessions échouent, puis la vraie base
+    state = {"left": failures}
+
+    def session_factory():
+        if state["left"]:
+            state["left"] -= 1
+            return _BrokenSession()
+        return SessionLocal()
+    return session_factory
+
+
+def _written(db) -> list[str]:
+    return list(db.scalars(select(AuditEvent.email)
+                           .order_by(AuditEvent.id)))
+
+
+def _record(writer, count: int, start: int = 0):
+    for number in range(start, start + count):
+        writer.record("login_success", email=f"user{number}@test.com")
+
+
+def test_events_are_written_in_batches(db):
+    writer = AuditWriter(SessionLocal, batch_size=3)
+    _record(writer, 7)
+    assert writer.stats()["pending"] == 7
+
+    assert writer.flush()
+    stats = writer.stats()
+    assert stats["written"] == 7
+    assert stats["batches"] == 3
+    assert stats["pending"] == 0
+    assert _written(db) == [f"user{n}@test.com" for n in range(7)]
+
+
+def test_events_are_dropped_when_buffer_is_full(db):
+    writer = AuditWriter(SessionLocal, capacity=2)
+    assert writer.record("login_success", email="a@test.com")
+    assert writer.record("login_success", email="b@test.com")
+    assert not writer.record("login_success", email="c@test.com")
+
+    stats = writer.stats()
+    assert stats["enqueued"] == 2
+    assert stats["dropped"] == 1
+    writer.flush()
+    assert _written(db) == ["a@test.com", "b@test.com"]
+
+
+def test_failed_batch_is_requeued_and_retried(db):
+    writer = AuditWriter(_flaky(2), batch_size=3, flush_interval=0.5,
+                         max_backoff=1.5)
+    _record(writer, 5)
+
+    assert not writer.flush()
+    # Le lot est remis en tête, dans l'ordre, rien n'est perdu
+    assert writer.stats()["pending"] == 5
+    assert writer.retry_delay() == 0.5
+    assert not writer.flush()
+    assert writer.retry_delay() == 1.0
+
+    _record(writer, 1, start=5)
+    assert writer.flush()
+    assert writer.retry_delay() == 0
+    stats = writer.stats()
+    assert stats["failed"] == 6
+    assert stats["written"] == 6
+    assert stats["dropped"] == 0
+    assert _written(db) == [f"user{n}@test.com" for n in range(6)]
+
+
+def test_backoff_is_capped():
+    writer = AuditWriter(_flaky(10), flush_interval=1.0, max_backoff=4.0)
+    _record(writer, 1)
+    for _ in range(5):
+        writer.flush()
+    assert writer.retry_delay() == 4.0
+
+
+def test_requeue_keeps_capacity(db):
+    writer = AuditWriter(_flaky(1), capacity=4, batch_size=3)
+    _record(writer, 3)
+
+    # Le tampon se remplit pendant l'écriture du lot qui échoue
+    flush_write = writer._write
+
+    def write_while_busy(batch):
+        _record(writer, 3, start=3)
+        return flush_write(batch)
+    writer._write = write_while_busy
+
+    assert not writer.flush()
+    stats = writer.stats()
+    assert stats["pending"] == 4
+    # Les deux plus anciens du lot en échec sont abandonnés
+    assert stats["dropped"] == 2
+    writer._write = flush_write
+    assert writer.flush()
+    assert _written(db) == [f"user{n}@test.com" for n in range(2, 6)]
+
+
+def test_stop_flushes_pending_events(db):
+    writer = AuditWriter(SessionLocal, flush_interval=60)
+    writer.start()
+    _record(writer, 3)
+
+    writer.stop()
+    assert writer.stats()["written"] == 3
+    assert len(_written(db)) == 3
+
+
+def test_stop_counts_events_lost_when_database_is_down():
+    writer = AuditWriter(_flaky(1))
+    _record(writer, 3)
+
+    writer.stop()
+    stats = writer.stats()
+    assert stats["pending"] == 0
+    assert stats["dropped"] == 3
+
+
+def test_concurrent_records_respect_capacity():
+    writer = AuditWriter(SessionLocal, capacity=1000, batch_size=10_000)
+
+    def worker():
+        _record(writer, 500)
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = writer.stats()
+    assert stats["pending"] == 1000
+    assert stats["enqueued"] == 1000
+    assert stats["dropped"] == 3000
@@ -1,29 +1,16 @@
-from fastapi.testclient import TestClient
-from backend.main import app
-from backend.database import SessionLocal
-from backend.models.user import User
-from backend.utils.security import hash_password
+from models.user import UserRole
 import pytest
 
-client = TestClient(app)
+from factories import make_user
 
 
 @pytest.fixture
-def create_test_user():
-    db = SessionLocal()
-    user = User(
-        email="admin@test.com",
-        hashed_password=hash_password("admin123"),
-        role="admin"
-    )
-    db.add(user)
-    db.commit()
-    yield user
-    db.delete(user)
-    db.commit()
+def create_test_user(db):
+    return make_user(db, "admin@test.com", name="Admin",
+                     password="admin123", role=UserRole.admin)
 
 
-def test_login_success(create_test_user):
+def test_login_success(client, create_test_user):
     response = client.post(
         "/token",
         data={"username": "admin@test.com", "password": "admin123"}
@@ -32,13 +19,45 @@ def test_login_success(create_test_user):
     assert "access_token" in response.json()
 
 
-def test_login_failure():
+def test_login_failure(client):
     response = client.post(
         "/token",
         data={"username": "wrong@test.com", "password": "wrongpass"}
     )
     assert response.status_code == 401
 
-def test_protected_route_forbidden():
+
+def test_protected_route_forbidden(client):
     response = client.get("/admin/users")  # pas de token
     assert response.status_code in [401, 403]
+
+
+def test_deactivated_user_is_rejected(client, db, create_test_user):
+    user = make_user(db, "client@test.com", password="client123")
+    token = client.post(
+        "/token",
+        data={"username": "client@test.com", "password": "client123"}
+    ).json()["access_token"]
+    admin_token = client.post(
+        "/token",
+        data={"username": "admin@test.com", "password": "admin123"}
+    ).json()["access_token"]
+
+    response = client.put(
+        f"/admin/users/{user.id}/active",
+        json={"is_active": False},
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+
+    # Plus de nouveau token, et l'ancien ne passe plus
+    response = client.post(
+        "/token",
+        data={"username": "client@test.com", "password": "client123"}
+    )
+    assert response.status_code == 403
+    response = client.get(
+        "/orders/unknown",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 403
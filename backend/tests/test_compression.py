@@ -0,0 +1,131 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+
+from utils.compression import CompressionMiddleware
+
+JSON = [(b"content-type", b"application/json")]
+
+
+def _app(headers: list, chunks: list[bytes], status: int = 200):
+    # Application ASGI minimale : en-têtes puis "chunks" en streaming
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status,
+                    "headers": list(headers)})
+        for number, chunk in enumerate(chunks, 1):
+            await send({"type": "http.response.body", "body": chunk,
+                        "more_body": number < len(chunks)})
+    return app
+
+
+def _call(app, accept_encoding: str | None = "gzip",
+          minimum_size: int = 500) -> tuple[dict, list[dict]]:
+    # Renvoie (en-têtes de la réponse, messages de corps envoyés)
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    request_headers = []
+    if accept_encoding is not None:
+        request_headers.append((b"accept-encoding",
+                                accept_encoding.encode()))
+    scope = {"type": "http", "method": "GET", "path": "/",
+             "headers": request_headers}
+    middleware = CompressionMiddleware(app, minimum_size=minimum_size)
+    asyncio.run(middleware(scope, receive, send))
+
+    start, *body = messages
+    assert start["type"] == "http.response.start"
+    headers = {key.decode(): value.decode() for key, value in start["headers"]}
+    return headers, body
+
+
+def _body(messages: list[dict]) -> bytes:
+    return b"".join(message.get("body", b"") for message in messages)
+
+
+def test_small_streamed_response_is_buffered_then_sent_as_is():
+    chunks = [b"a" * 100, b"b" * 100, b"c" * 100]
+    headers, body = _call(_app(JSON, chunks))
+
+    # Trois morceaux de 100 octets < 500 : un seul envoi, non compressé
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    assert len(body) == 1
+    assert body[0]["more_body"] is False
+    assert _body(body) == b"".join(chunks)
+
+
+def test_streamed_response_is_compressed_once_minimum_is_reached():
+    chunks = [b'{"a": 1}' * 40, b'{"b": 2}' * 40, b'{"c": 3}' * 40]
+    headers, body = _call(_app(JSON + [(b"content-length", b"960")],
+                               chunks))
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    # Le premier morceau (320 octets) attend le deuxième, puis
+    # chaque morceau est envoyé dès qu'il est compressé
+    assert [message["more_body"] for message in body] == [True, False]
+    partial = zlib.decompressobj(31).decompress(body[0]["body"])
+    assert partial == chunks[0] + chunks[1]
+    assert gzip.decompress(_body(body)) == b"".join(chunks)
+
+
+def test_strong_etag_gets_coding_suffix():
+    headers, _ = _call(_app(JSON + [(b"etag", b'"abc"')], [b"x" * 1000]))
+    assert headers["etag"] == '"abc-gzip"'
+
+    headers, _ = _call(_app(JSON + [(b"etag", b'W/"abc"')], [b"x" * 1000]))
+    assert headers["etag"] == 'W/"abc"'
+
+
+@pytest.mark.parametrize("accept_encoding", [
+    "gzip;q=0", "identity", "*;q=0", None])
+def test_no_acceptable_encoding_passes_through(accept_encoding):
+    headers, body = _call(_app(JSON, [b"x" * 1000]), accept_encoding)
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    assert _body(body) == b"x" * 1000
+
+
+def test_already_encoded_response_passes_through():
+    payload = gzip.compress(b"x" * 1000)
+    headers, body = _call(_app(JSON + [(b"content-encoding", b"gzip")],
+                               [payload]), "br, gzip")
+    assert headers["content-encoding"] == "gzip"
+    assert _body(body) == payload
+
+
+def test_no_transform_passes_through():
+    headers, body = _call(_app(
+        JSON + [(b"cache-control", b"private, no-transform")],
+        [b"x" * 1000]))
+    assert "content-encoding" not in headers
+    assert _body(body) == b"x" * 1000
+
+
+def test_server_sent_events_pass_through_unbuffered():
+    events = [b"data: 1\n\n", b"data: 2\n\n", b""]
+    headers, body = _call(_app([(b"content-type", b"text/event-stream")],
+                               events))
+    assert "content-encoding" not in headers
+    assert "vary" not in headers
+    # Chaque événement part tout de suite, même sous minimum_size
+    assert [message["body"] for message in body] == events
+
+
+@pytest.mark.parametrize("vary, expected", [
+    (b"Origin", "Origin, Accept-Encoding"),
+    (b"Origin, accept-encoding", "Origin, accept-encoding"),
+    (b"*", "*"),
+])
+def test_vary_is_merged(vary, expected):
+    headers, _ = _call(_app(JSON + [(b"vary", vary)], [b"x" * 1000]))
+    assert headers["vary"] == expected
+    assert headers["content-encoding"] == "gzip"
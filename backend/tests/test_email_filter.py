@@ -0,0 +1,175 @@
+import fakeredis
+import pytest
+from sqlalchemy import select
+
+import crud.user
+import main
+import utils.tasks
+from models.user import User
+from utils.email_filter import (BloomFilter, EmailFilter,
+                                EmailFilterUnavailable, REDIS_BITS_KEY,
+                                REDIS_READY_KEY, resolve_backend)
+from factories import seed_users
+
+
+def _filter(backend="memory", redis_client=None, capacity=10_000):
+    return EmailFilter(BloomFilter(capacity, 0.001), backend=backend,
+                       redis_client=redis_client)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def email_filter(request):
+    if request.param == "redis":
+        return _filter("redis", fakeredis.FakeRedis(decode_responses=True))
+    return _filter()
+
+
+def test_bloom_filter_sizing():
+    bloom = BloomFilter(1_000_000, 0.001)
+    # ≈ 1,8 Mo de bits et 10 fonctions de hachage
+    assert 14_000_000 < bloom.size < 15_000_000
+    assert bloom.hash_count == 10
+    offsets = bloom.offsets("awa@test.com")
+    assert offsets == bloom.offsets("awa@test.com")
+    assert all(0 <= offset < bloom.size for offset in offsets)
+
+
+def test_maybe_before_ready(email_filter):
+    email_filter.add("awa@test.com")
+    assert email_filter.might_exist("inconnu@test.com")
+
+
+def test_no_false_negatives_after_build_and_add(db, email_filter):
+    seed_users(db, 2000)
+    email_filter.build(db)
+    email_filter.add("nouveau@test.com")
+
+    emails = db.scalars(select(User.email)).all()
+    assert all(email_filter.might_exist(email) for email in emails)
+    assert email_filter.might_exist("nouveau@test.com")
+    # Taux de faux positifs proche de la cible (0,1 %)
+    false_positives = sum(email_filter.might_exist(f"absent{n}@test.com")
+                          for n in range(2000))
+    assert false_positives < 20
+
+
+def test_maybe_when_redis_fails(db):
+    server = fakeredis.FakeServer()
+    email_filter = _filter("redis", fakeredis.FakeRedis(
+        server=server, decode_responses=True))
+    seed_users(db, 10)
+    email_filter.build(db)
+    assert not email_filter.might_exist("inconnu@test.com")
+
+    server.connected = False
+    assert email_filter.might_exist("inconnu@test.com")
+
+
+def test_bits_evicted_means_maybe(db):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    email_filter = _filter("redis", client)
+    seed_users(db, 10)
+    email_filter.build(db)
+    assert not email_filter.might_exist("inconnu@test.com")
+
+    client.delete(REDIS_BITS_KEY)
+    assert email_filter.might_exist("inconnu@test.com")
+
+
+def test_add_after_bits_evicted_means_maybe(db):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    email_filter = _filter("redis", client)
+    other_worker = _filter("redis", client)
+    seed_users(db, 10)
+    email_filter.build(db)
+    other_worker.build(db)
+    old_email = db.scalars(select(User.email)).first()
+
+    # L'ajout recrée la clé des bits avec le seul nouvel email
+    client.delete(REDIS_BITS_KEY)
+    email_filter.add("nouveau@test.com")
+    assert email_filter.might_exist(old_email)
+    assert other_worker.might_exist(old_email)
+    assert not email_filter.ready
+    assert not client.exists(REDIS_READY_KEY)
+
+    # Reconstruction par un worker, l'autre se réactive
+    assert not other_worker.refresh()
+    email_filter.build(db)
+    assert other_worker.refresh()
+    assert other_worker.might_exist(old_email)
+    assert other_worker.might_exist("nouveau@test.com")
+    assert not other_worker.might_exist("inconnu@test.com")
+
+
+def test_disabled_filter_is_rebuilt_once(db, monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    email_filter = _filter("redis", client)
+    monkeypatch.setattr(main, "email_filter", email_filter)
+    monkeypatch.setattr(utils.tasks, "r", client)
+    seed_users(db, 10)
+    email_filter.build(db)
+
+    client.delete(REDIS_BITS_KEY)
+    email_filter.add("nouveau@test.com")
+    main.check_email_filter_job()
+    assert email_filter.ready
+    assert not email_filter.might_exist("inconnu@test.com")
+
+    # Bail déjà pris : un autre worker ne reconstruit pas
+    client.delete(REDIS_READY_KEY)
+    main.check_email_filter_job()
+    assert not email_filter.ready
+
+
+def test_failed_add_is_reported(db):
+    server = fakeredis.FakeServer()
+    email_filter = _filter("redis", fakeredis.FakeRedis(
+        server=server, decode_responses=True))
+    email_filter.build(db)
+
+    server.connected = False
+    with pytest.raises(EmailFilterUnavailable):
+        email_filter.add("nouveau@test.com")
+    assert not email_filter.ready
+
+
+def test_register_refused_when_filter_is_unavailable(client, db,
+                                                     monkeypatch):
+    server = fakeredis.FakeServer()
+    email_filter = _filter("redis", fakeredis.FakeRedis(
+        server=server, decode_responses=True))
+    email_filter.build(db)
+    monkeypatch.setattr(crud.user, "email_filter", email_filter)
+
+    server.connected = False
+    response = client.post("/register", json={
+        "name": "Awa Diop", "email": "awa@test.com", "password": "secret123"})
+    assert response.status_code == 503
+    # Pas d'utilisateur absent du filtre partagé
+    assert db.scalars(select(User).where(
+        User.email == "awa@test.com")).first() is None
+
+
+def test_redis_filter_is_shared_between_workers(db):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    worker_a = _filter("redis", client)
+    worker_b = _filter("redis", client)
+    worker_a.build(db)
+    worker_b.build(db)
+
+    # Inscription traitée par un worker, login par l'autre
+    worker_a.add("nouveau@test.com")
+    assert worker_b.might_exist("nouveau@test.com")
+
+
+def test_resolve_backend(monkeypatch):
+    redis_client = fakeredis.FakeRedis()
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert resolve_backend("auto", redis_client) == "redis"
+    assert resolve_backend("auto", None) == "memory"
+    assert resolve_backend("memory", redis_client) == "memory"
+    # Plusieurs workers sans Redis : un filtre par processus
+    # donnerait des faux négatifs
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert resolve_backend("auto", None) == "off"
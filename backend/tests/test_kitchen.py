@@ -0,0 +1,65 @@
+import asyncio
+
+from database import SessionLocal, engine
+from main import app
+from models.user import User, UserRole
+from utils.kitchen_hub import kitchen_hub
+from factories import auth_headers, make_user
+
+
+async def _open_sse_stream(headers: dict) -> tuple[int, int]:
+    # Appel ASGI direct : TestClient attendrait la fin du flux.
+    # Renvoie (statut, connexions SQL prises pendant le flux)
+    started = asyncio.Event()
+    status = {}
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+            started.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/kitchen/events",
+        "raw_path": b"/kitchen/events", "root_path": "", "query_string": b"",
+        "headers": [(key.lower().encode(), value.encode())
+                    for key, value in headers.items()],
+        "client": ("127.0.0.1", 1234), "server": ("test", 80),
+    }
+    task = asyncio.create_task(app(scope, receive, send))
+    await asyncio.wait_for(started.wait(), 5)
+    await asyncio.sleep(0.1)
+    checked_out = engine.pool.checkedout()
+    connections = kitchen_hub.connections
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert connections == 1
+    return status["code"], checked_out
+
+
+def test_sse_stream_does_not_hold_a_database_connection():
+    # Sans la fixture "db" : le code utilise le vrai pool
+    setup = SessionLocal()
+    staff = make_user(setup, "kitchen@test.com", role=UserRole.staff)
+    headers = auth_headers(staff)
+    setup.commit()
+    setup.close()
+    try:
+        baseline = engine.pool.checkedout()
+        status, checked_out = asyncio.run(_open_sse_stream(headers))
+        assert status == 200
+        assert checked_out == baseline
+    finally:
+        cleanup = SessionLocal()
+        cleanup.query(User).filter(User.email == "kitchen@test.com").delete()
+        cleanup.commit()
+        cleanup.close()
+
+
+def test_sse_requires_staff(client, db):
+    user = make_user(db, "client@test.com")
+    response = client.get("/kitchen/events", headers=auth_headers(user))
+    assert response.status_code == 403
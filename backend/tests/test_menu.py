@@ -0,0 +1,71 @@
+import pytest
+
+from models.user import UserRole
+from factories import auth_headers, make_user
+
+GZIP = {"Accept-Encoding": "gzip"}
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+@pytest.fixture
+def staff_headers(db):
+    staff = make_user(db, "chef@test.com", role=UserRole.staff)
+    return auth_headers(staff)
+
+
+@pytest.fixture
+def menu(client, staff_headers):
+    for name in ("Thieboudienne", "Yassa poulet", "Mafé"):
+        response = client.post("/menu/items", json={
+            "name": name, "price": 3500, "category": "Plats"},
+            headers=staff_headers)
+        assert response.status_code == 201
+
+
+def test_menu_gzip_and_identity_have_distinct_etags(client, menu):
+    compressed = client.get("/menu", headers=GZIP)
+    identity = client.get("/menu", headers=IDENTITY)
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in identity.headers
+    assert compressed.json() == identity.json()
+    assert len(identity.json()) == 3
+    assert compressed.headers["etag"] != identity.headers["etag"]
+    assert compressed.headers["etag"].endswith('-gzip"')
+    assert "Accept-Encoding" in compressed.headers["vary"]
+
+
+def test_menu_not_modified(client, menu):
+    compressed = client.get("/menu", headers=GZIP).headers["etag"]
+    identity = client.get("/menu", headers=IDENTITY).headers["etag"]
+
+    # L'une ou l'autre variante valide le même contenu
+    for etag in (compressed, identity, f"W/{identity}"):
+        response = client.get("/menu",
+                              headers={**GZIP, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == compressed
+        assert response.content == b""
+
+    response = client.get("/menu", headers={**IDENTITY,
+                                            "If-None-Match": compressed})
+    assert response.status_code == 304
+    assert response.headers["etag"] == identity
+
+    response = client.get("/menu", headers={**GZIP,
+                                            "If-None-Match": '"autre"'})
+    assert response.status_code == 200
+
+
+def test_menu_write_invalidates_cache(client, menu, staff_headers):
+    etag = client.get("/menu", headers=GZIP).headers["etag"]
+
+    response = client.post("/menu/items", json={
+        "name": "Pastels", "price": 1500, "category": "Entrées"},
+        headers=staff_headers)
+    assert response.status_code == 201
+
+    response = client.get("/menu", headers={**GZIP, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert "Pastels" in [item["name"] for item in response.json()]
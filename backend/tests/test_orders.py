@@ -0,0 +1,203 @@
+import json
+
+import fakeredis
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import OperationalError
+
+import utils.order_queue
+from database import SessionLocal
+from models.order import Order
+from models.user import UserRole
+from utils.menu_cache import menu_cache
+from utils.order_queue import (ORDERS_DEAD_STREAM, ORDERS_GROUP,
+                               ORDERS_STREAM, OrderConsumer, enqueue_order)
+from factories import auth_headers, make_user
+
+ITEMS = [{"menu_item_id": 1, "name": "Thieboudienne", "unit_price": 3500,
+          "quantity": 2}]
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(utils.order_queue, "r", redis_client)
+    return redis_client
+
+
+@pytest.fixture
+def customer(db):
+    return make_user(db, "client@test.com")
+
+
+def _consumer(queue, **options) -> OrderConsumer:
+    consumer = OrderConsumer(queue, SessionLocal, block_ms=10, **options)
+    consumer.ensure_group()
+    return consumer
+
+
+class _DownSession:
+    # Base injoignable : chaque requête échoue
+    def execute(self, *args, **kwargs):
+        raise OperationalError("SELECT", {}, Exception("connexion perdue"))
+
+    def scalars(self, *args, **kwargs):
+        return self.execute(*args, **kwargs)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _order_count(db) -> int:
+    return db.scalar(select(func.count()).select_from(Order))
+
+
+def _dead_letters(queue) -> list[dict]:
+    return [fields for _, fields in queue.xrange(ORDERS_DEAD_STREAM)]
+
+
+def test_submit_order_without_database(client, db, queue, customer):
+    staff = make_user(db, "chef@test.com", role=UserRole.staff)
+    response = client.post("/menu/items", json={
+        "name": "Thieboudienne", "price": 3500, "category": "Plats"},
+        headers=auth_headers(staff))
+    menu_item_id = response.json()["id"]
+    menu_cache.get(db)
+    headers = auth_headers(customer)
+
+    statements = []
+    listener = (lambda *args: statements.append(args[2]))
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        response = client.post("/orders", json={
+            "items": [{"menu_item_id": menu_item_id, "quantity": 2}]},
+            headers=headers)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert response.status_code == 202
+    assert response.json()["total"] == 7000
+    # Token et carte en cache : aucune requête SQL
+    assert statements == []
+    [(_, fields)] = queue.xrange(ORDERS_STREAM)
+    assert json.loads(fields["order"])["user_id"] == customer.id
+
+
+def test_submit_order_requires_client(client, db, queue):
+    staff = make_user(db, "chef@test.com", role=UserRole.staff)
+    response = client.post("/orders", json={
+        "items": [{"menu_item_id": 1, "quantity": 1}]},
+        headers=auth_headers(staff))
+    assert response.status_code == 403
+
+
+def test_batch_is_persisted_in_one_go(db, queue, customer):
+    consumer = _consumer(queue)
+    ids = [enqueue_order(customer.id, ITEMS, 7000) for _ in range(3)]
+
+    assert consumer.run_once() == 3
+    assert consumer.persisted == 3
+    assert _order_count(db) == 3
+    assert db.get(Order, ids[0]).items[0].quantity == 2
+    assert queue.xpending(ORDERS_STREAM, ORDERS_GROUP)["pending"] == 0
+
+
+def test_failed_batch_is_retried_order_by_order(db, queue, customer):
+    consumer = _consumer(queue, retry_idle_ms=0, max_deliveries=2)
+    enqueue_order(customer.id, ITEMS, 7000)
+    broken = enqueue_order(customer.id, [{**ITEMS[0], "quantity": None}],
+                           0)
+    enqueue_order(customer.id, ITEMS, 7000)
+
+    # Le lot échoue : les deux bonnes commandes passent une par une,
+    # la mauvaise reste en attente dans Redis
+    assert consumer.run_once() == 3
+    assert _order_count(db) == 2
+    pending = queue.xpending_range(ORDERS_STREAM, ORDERS_GROUP,
+                                   min="-", max="+", count=10)
+    assert len(pending) == 1
+
+    # Reprise par XAUTOCLAIM, puis dead-letter après 2 livraisons
+    assert consumer.run_once() == 1
+    assert queue.xpending(ORDERS_STREAM, ORDERS_GROUP)["pending"] == 0
+    [dead] = _dead_letters(queue)
+    assert json.loads(dead["order"])["id"] == broken
+    assert dead["reason"] == "nombre maximal de tentatives atteint"
+    assert consumer.dead_lettered == 1
+    assert _order_count(db) == 2
+
+
+def test_stale_message_is_claimed_by_another_worker(db, queue, customer):
+    order_id = enqueue_order(customer.id, ITEMS, 7000)
+    # Un worker lit le message puis s'arrête sans l'acquitter
+    queue.xgroup_create(ORDERS_STREAM, ORDERS_GROUP, id="0")
+    queue.xreadgroup(ORDERS_GROUP, "crashed", {ORDERS_STREAM: ">"})
+
+    consumer = _consumer(queue, retry_idle_ms=0)
+    assert consumer.run_once() == 1
+    assert db.get(Order, order_id) is not None
+    assert queue.xpending(ORDERS_STREAM, ORDERS_GROUP)["pending"] == 0
+
+
+def test_replayed_order_is_persisted_once(db, queue, customer):
+    consumer = _consumer(queue)
+    order_id = enqueue_order(customer.id, ITEMS, 7000)
+    [(_, fields)] = queue.xrange(ORDERS_STREAM)
+    # Même message deux fois dans le lot, puis rejoué plus tard
+    # (acquittement perdu)
+    queue.xadd(ORDERS_STREAM, fields)
+    assert consumer.run_once() == 2
+    queue.xadd(ORDERS_STREAM, fields)
+    assert consumer.run_once() == 1
+
+    assert consumer.persisted == 1
+    assert _order_count(db) == 1
+    assert db.get(Order, order_id) is not None
+    assert queue.xpending(ORDERS_STREAM, ORDERS_GROUP)["pending"] == 0
+
+
+def test_orders_of_deactivated_accounts_are_rejected(db, queue, customer):
+    consumer = _consumer(queue)
+    inactive = make_user(db, "parti@test.com", is_active=False)
+    enqueue_order(customer.id, ITEMS, 7000)
+    enqueue_order(inactive.id, ITEMS, 7000)
+
+    assert consumer.run_once() == 2
+    assert _order_count(db) == 1
+    [dead] = _dead_letters(queue)
+    assert json.loads(dead["order"])["user_id"] == inactive.id
+    assert dead["reason"] == "compte désactivé"
+
+
+def test_database_outage_keeps_orders_pending(db, queue, customer):
+    sessions = []
+
+    def session_factory():
+        sessions.append(_DownSession())
+        return sessions[-1]
+    consumer = OrderConsumer(queue, session_factory,
+                             block_ms=10, retry_idle_ms=0, max_deliveries=2,
+                             backoff=0.5, max_backoff=1.0)
+    consumer.ensure_group()
+    order_ids = [enqueue_order(customer.id, ITEMS, 7000) for _ in range(3)]
+
+    for _ in range(5):
+        assert consumer.run_once() == 3
+    # Une seule session par lot, pas de retry commande par commande
+    assert len(sessions) == 5
+    assert consumer.retry_delay() == 1.0
+    assert not _dead_letters(queue)
+    pending = queue.xpending_range(ORDERS_STREAM, ORDERS_GROUP,
+                                   min="-", max="+", count=10)
+    # Les livraisons pendant la panne ne comptent pas
+    assert [entry["times_delivered"] for entry in pending] == [0, 0, 0]
+
+    # La base revient : les commandes sont enregistrées
+    consumer.session_factory = SessionLocal
+    assert consumer.run_once() == 3
+    assert consumer.retry_delay() == 0
+    assert all(db.get(Order, order_id) for order_id in order_ids)
+    assert queue.xpending(ORDERS_STREAM, ORDERS_GROUP)["pending"] == 0
@@ -0,0 +1,228 @@
+import time
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, update
+
+import crud.user
+import utils.tasks
+from crud.stats import reconcile_user_stats
+from database import SessionLocal, engine
+from main import app
+from models.stats import UserStatCounter
+from models.user import User, UserRole
+from utils.search import setup_sqlite_fts
+from utils.tasks import acquire_lease
+from factories import auth_headers, make_user, seed_users
+
+
+@pytest.fixture
+def admin_headers(db):
+    admin = make_user(db, "admin@test.com", name="Admin",
+                      role=UserRole.admin)
+    return auth_headers(admin)
+
+
+# Deux fois la même inscription : chaque test repart d'une base
+# vide, quel que soit l'ordre ou le worker
+@pytest.mark.parametrize("run", [1, 2])
+def test_register_is_isolated(client, run):
+    response = client.post("/register", json={
+        "name": "Awa Diop", "email": "awa@test.com", "password": "secret123"})
+    assert response.status_code == 200
+
+
+def test_search_users(client, db, admin_headers):
+    make_user(db, "fatou.ndiaye@test.com", name="Fatou Ndiaye")
+    make_user(db, "moussa.fall@test.com", name="Moussa Fall")
+
+    response = client.get("/admin/users", params={"q": "ndia"},
+                          headers=admin_headers)
+    assert response.status_code == 200
+    assert [user["email"] for user in response.json()] == [
+        "fatou.ndiaye@test.com"]
+
+
+def test_search_users_many_matches(client, db, admin_headers):
+    # Plus de correspondances que de candidats retenus par branche
+    seed_users(db, 2000)
+    make_user(db, "zoe@test.com", name="Diallo Zoé")
+
+    response = client.get("/admin/users",
+                          params={"q": "diallo", "limit": 50},
+                          headers=admin_headers)
+    assert response.status_code == 200
+    users = response.json()
+    assert len(users) == 50
+    # Le début de nom passe avant les autres correspondances
+    assert users[0]["email"] == "zoe@test.com"
+    assert all("diallo" in user["email"] for user in users[1:])
+
+    response = client.get("/admin/users", params={"q": "zo"},
+                          headers=admin_headers)
+    assert [user["email"] for user in response.json()] == ["zoe@test.com"]
+
+
+def test_sqlite_fts_rebuilt_only_when_created(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fts.db'}")
+    User.__table__.create(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda *args: statements.append(args[2]))
+
+    setup_sqlite_fts(engine)
+    rebuilds = [s for s in statements if "'rebuild'" in s]
+    assert len(rebuilds) == 1
+    # Redémarrage : les triggers tiennent déjà l'index à jour
+    statements.clear()
+    setup_sqlite_fts(engine)
+    assert not [s for s in statements if "'rebuild'" in s]
+    engine.dispose()
+
+
+def test_export_holds_one_database_connection(monkeypatch):
+    # Sans la fixture "db" : le code utilise le vrai pool
+    setup = SessionLocal()
+    admin = make_user(setup, "export@test.com", role=UserRole.admin)
+    headers = auth_headers(admin)
+    setup.commit()
+    setup.close()
+
+    iter_users = crud.user.iter_users
+    checked_out = []
+
+    def counting_iter_users(db, *args, **kwargs):
+        for user in iter_users(db, *args, **kwargs):
+            checked_out.append(engine.pool.checkedout())
+            yield user
+    monkeypatch.setattr(crud.user, "iter_users", counting_iter_users)
+    try:
+        baseline = engine.pool.checkedout()
+        response = TestClient(app).get("/admin/users/export",
+                                       headers=headers)
+        assert response.status_code == 200
+        assert "export@test.com" in response.text
+        # Seulement la session du générateur pendant le flux
+        assert set(checked_out) == {baseline + 1}
+    finally:
+        cleanup = SessionLocal()
+        cleanup.query(User).filter(User.email == "export@test.com").delete()
+        cleanup.commit()
+        cleanup.close()
+
+
+def test_export_requires_admin(client, db):
+    user = make_user(db, "client@test.com")
+    response = client.get("/admin/users/export", headers=auth_headers(user))
+    assert response.status_code == 403
+
+
+def test_user_stats(client, db, admin_headers):
+    seed_users(db, 500, days=20)
+    reconcile_user_stats(db)
+
+    stats = client.get("/admin/stats", headers=admin_headers).json()
+    assert sum(stats["roles"].values()) == 501
+    assert stats["active"] + stats["inactive"] == 501
+    assert sum(day["count"] for day in stats["signups_per_day"]) == 501
+
+
+def _stats(client, headers) -> dict:
+    return client.get("/admin/stats", headers=headers).json()
+
+
+# Les compteurs sont tenus à jour par les écritures elles-mêmes,
+# sans recalcul
+def test_register_updates_stats(client, admin_headers):
+    before = _stats(client, admin_headers)
+    response = client.post("/register", json={
+        "name": "Awa Diop", "email": "awa@test.com", "password": "secret123"})
+    assert response.status_code == 200
+
+    after = _stats(client, admin_headers)
+    assert after["roles"]["client"] == before["roles"]["client"] + 1
+    assert after["active"] == before["active"] + 1
+    assert after["inactive"] == before["inactive"]
+    assert (sum(day["count"] for day in after["signups_per_day"])
+            == sum(day["count"] for day in before["signups_per_day"]) + 1)
+
+
+def test_role_change_updates_stats(client, admin_headers):
+    user = client.post("/register", json={
+        "name": "Awa Diop", "email": "awa@test.com",
+        "password": "secret123"}).json()
+    before = _stats(client, admin_headers)
+
+    response = client.put(f"/admin/users/{user['id']}/role",
+                          json={"role": "staff"}, headers=admin_headers)
+    assert response.status_code == 200
+    after = _stats(client, admin_headers)
+    assert after["roles"]["client"] == before["roles"]["client"] - 1
+    assert after["roles"]["staff"] == before["roles"]["staff"] + 1
+    assert after["active"] == before["active"]
+
+    # Même rôle : aucun changement
+    client.put(f"/admin/users/{user['id']}/role",
+               json={"role": "staff"}, headers=admin_headers)
+    assert _stats(client, admin_headers) == after
+
+
+def test_deactivate_updates_stats(client, admin_headers):
+    user = client.post("/register", json={
+        "name": "Awa Diop", "email": "awa@test.com",
+        "password": "secret123"}).json()
+    before = _stats(client, admin_headers)
+
+    response = client.put(f"/admin/users/{user['id']}/active",
+                          json={"is_active": False}, headers=admin_headers)
+    assert response.status_code == 200
+    after = _stats(client, admin_headers)
+    assert after["active"] == before["active"] - 1
+    assert after["inactive"] == before["inactive"] + 1
+    assert after["roles"] == before["roles"]
+
+    response = client.put(f"/admin/users/{user['id']}/active",
+                          json={"is_active": True}, headers=admin_headers)
+    assert _stats(client, admin_headers) == before
+
+
+def test_reconcile_fixes_drift(client, db, admin_headers):
+    seed_users(db, 200, days=20)
+    reconcile_user_stats(db)
+    expected = client.get("/admin/stats", headers=admin_headers).json()
+
+    # Compteurs faussés : le recalcul remet les valeurs absolues
+    db.execute(update(UserStatCounter).values(value=UserStatCounter.value
+                                              + 7))
+    db.commit()
+    response = client.post("/admin/stats/reconcile", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json() == expected
+
+
+def test_reconcile_lease_runs_once_per_period(monkeypatch):
+    monkeypatch.setattr(utils.tasks, "r", fakeredis.FakeRedis())
+    assert acquire_lease("user_stats_reconcile", 60)
+    # Autre worker, ou redémarrage dans la même période
+    assert not acquire_lease("user_stats_reconcile", 60)
+
+
+@pytest.mark.perf
+def test_large_user_table(client, db, admin_headers):
+    started = time.perf_counter()
+    seed_users(db, 50_000)
+    assert time.perf_counter() - started < 30
+
+    started = time.perf_counter()
+    for term in ("diallo", "mbaye12", "claire.martin4"):
+        response = client.get("/admin/users", params={"q": term, "limit": 50},
+                              headers=admin_headers)
+        assert response.status_code == 200
+        assert response.json()
+    assert time.perf_counter() - started < 5
+
+    response = client.get("/admin/users/export", headers=admin_headers)
+    assert response.status_code == 200
+    # En-tête + admin + utilisateurs générés
+    assert response.text.count("\n") == 50_002
@@ -0,0 +1,194 @@
+# utils/audit.py
+
+# Écriture asynchrone du journal d'audit.
+# record() ne fait qu'ajouter un dict dans un tampon en mémoire
+# (quelques microsecondes, aucun accès base) ; un thread de fond
+# vide le tampon par lots avec un INSERT multi-lignes :
+# - dès que "batch_size" événements sont en attente
+# - au plus tard toutes les "flush_interval" secondes
+# - à l'arrêt de l'application (stop)
+# Si l'écriture d'un lot échoue, le lot est remis en tête du
+# tampon (dans la limite de sa capacité) et réessayé après un
+# délai qui double à chaque échec, jusqu'à "max_backoff".
+# Si le tampon est plein (base lente ou indisponible), les
+# événements en trop sont abandonnés et comptés dans "dropped"
+# plutôt que de ralentir les requêtes.
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from config.settings import settings
+from database import SessionLocal
+from models.audit import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+
+    def __init__(self, session_factory, capacity: int = 10_000,
+                 batch_size: int = 500, flush_interval: float = 1.0,
+                 max_backoff: float = 60.0):
+        self.session_factory = session_factory
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self._buffer: deque[dict] = deque()
+        # Protège le tampon et les compteurs : le test de capacité
+        # et l'ajout doivent être atomiques entre les threads des
+        # requêtes et le thread de fond (section très courte)
+        self._lock = threading.Lock()
+        # Échecs d'écriture consécutifs (délai avant nouvel essai)
+        self._failures = 0
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        # Un seul flush à la fois (thread de fond ou stop)
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def record(self, event_type: str, *, user_id: int | None = None,
+               email: str | None = None, actor_id: int | None = None,
+               ip: str | None = None, detail: dict | None = None) -> bool:
+        # Non bloquant : renvoie False si l'événement est abandonné
+        event = {
+            "event_type": event_type,
+            "user_id": user_id,
+            "email": email,
+            "actor_id": actor_id,
+            "ip": ip,
+            "detail": detail,
+            "created_at": datetime.utcnow(),
+        }
+        with self._lock:
+            if len(self._buffer) >= self.capacity:
+                self.dropped += 1
+                return False
+            self._buffer.append(event)
+            self.enqueued += 1
+            pending = len(self._buffer)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def flush(self) -> bool:
+        # Écrit tout ce qui est en attente, par lots de batch_size.
+        # S'arrête au premier échec (le lot est remis dans le
+        # tampon) et renvoie False.
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._buffer.popleft() for _ in
+                             range(min(self.batch_size, len(self._buffer)))]
+                if not batch:
+                    return True
+                if not self._write(batch):
+                    self._requeue(batch)
+                    return False
+
+    def _write(self, batch: list[dict]) -> bool:
+        db = self.session_factory()
+        try:
+            # executemany : SQLAlchemy le transforme en INSERT
+            # ... VALUES (...), (...), ... multi-lignes
+            db.execute(insert(AuditEvent), batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self.failed += len(batch)
+                self._failures += 1
+            logger.exception("Échec de l'écriture de %d événements d'audit",
+                             len(batch))
+            return False
+        finally:
+            db.close()
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+            self._failures = 0
+        return True
+
+    def _requeue(self, batch: list[dict]):
+        # Remet le lot en tête du tampon, dans l'ordre. Les
+        # requêtes ont pu le remplir entre-temps : on garde alors
+        # les événements les plus récents du lot.
+        with self._lock:
+            room = max(self.capacity - len(self._buffer), 0)
+            kept = batch[len(batch) - room:] if room < len(batch) else batch
+            self.dropped += len(batch) - len(kept)
+            self._buffer.extendleft(reversed(kept))
+
+    def retry_delay(self) -> float:
+        # 0 si la dernière écriture a réussi, sinon
+        # flush_interval x 2^(échecs - 1), plafonné à max_backoff
+        if not self._failures:
+            return 0.0
+        return min(self.flush_interval * 2 ** (self._failures - 1),
+                   self.max_backoff)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            delay = self.retry_delay()
+            if delay:
+                # Base en échec : on ne réessaie pas avant le délai,
+                # même si le tampon se remplit
+                self._stopping.wait(delay)
+            else:
+                self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-writer",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        # Arrête le thread puis écrit ce qui reste dans le tampon.
+        # Si la base refuse encore, les événements restants sont
+        # perdus (comptés dans "dropped").
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if not self.flush():
+            with self._lock:
+                lost = len(self._buffer)
+                self._buffer.clear()
+                self.dropped += lost
+            logger.error("%d événements d'audit perdus à l'arrêt", lost)
+
+    def stats(self) -> dict:
+        # "failed" compte les événements des écritures en échec
+        # (réessayés ensuite), "dropped" ceux réellement perdus
+        return {
+            "pending": len(self._buffer),
+            "capacity": self.capacity,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+# Instance partagée, démarrée / arrêtée par le lifespan de main.py
+audit_writer = AuditWriter(
+    SessionLocal,
+    capacity=settings.AUDIT_BUFFER_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_SECONDS,
+)
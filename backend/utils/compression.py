@@ -0,0 +1,300 @@
+# utils/compression.py
+
+# Compression des réponses HTTP (middleware ASGI).
+# - gzip toujours disponible ; brotli ("br") et zstd si les
+#   bibliothèques brotli / zstandard sont installées
+# - l'encodage est choisi selon Accept-Encoding (q=...) et, à
+#   égalité, selon ENCODING_PREFERENCE
+# - les réponses plus petites que "minimum_size" ne sont pas
+#   compressées (l'en-tête coûte plus que le gain)
+# - les réponses en streaming (exports) sont compressées au fil
+#   de l'eau : chaque morceau est envoyé dès qu'il est compressé
+# - les réponses déjà compressées (ex: GET /menu), les types
+#   non compressibles et le flux SSE ne sont pas touchés
+# Les niveaux par défaut viennent de benchmarks/bench_compression.py.
+import zlib
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # dépendance optionnelle
+    zstandard = None
+
+# Niveaux par défaut, choisis avec benchmarks/bench_compression.py
+# (20 000 utilisateurs, JSON de 2,7 Mo) : chacun est au coude de
+# la courbe, autour de 20-25 ms CPU par Mo pour un ratio ~8.
+# Au-delà (gzip 9, br 6+, zstd 15+) le CPU augmente bien plus
+# vite que le gain en octets.
+DEFAULT_LEVELS = {"gzip": 6, "br": 5, "zstd": 9}
+
+# Ordre de préférence du serveur à q égal
+ENCODING_PREFERENCE = ("zstd", "br", "gzip")
+
+# Types de contenu compressibles (text/event-stream exclu : la
+# compression retarderait les événements SSE)
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/csv",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/xml",
+    "image/svg+xml",
+)
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        # wbits=31 : format gzip (en-tête + CRC)
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        # Vide le tampon sans terminer le flux (streaming)
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    def __init__(self, level: int):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_encoders() -> dict:
+    encoders = {"gzip": GzipEncoder}
+    if brotli is not None:
+        encoders["br"] = BrotliEncoder
+    if zstandard is not None:
+        encoders["zstd"] = ZstdEncoder
+    return encoders
+
+
+def parse_accept_encoding(accept_encoding: str | None) -> dict[str, float]:
+    # "gzip, br;q=0.8" → {"gzip": 1.0, "br": 0.8}
+    allowed: dict[str, float] = {}
+    if not accept_encoding:
+        return allowed
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name.strip():
+            allowed[name.strip()] = q
+    return allowed
+
+
+def accepts_encoding(accept_encoding: str | None, encoding: str) -> bool:
+    # True si l'en-tête Accept-Encoding autorise "encoding"
+    # (en tenant compte de q=0 et de "*")
+    allowed = parse_accept_encoding(accept_encoding)
+    if encoding in allowed:
+        return allowed[encoding] > 0
+    return allowed.get("*", 0) > 0
+
+
+def choose_encoding(accept_encoding: str | None,
+                    supported) -> str | None:
+    # Meilleur encodage accepté par le client parmi "supported"
+    allowed = parse_accept_encoding(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding not in supported:
+            continue
+        q = allowed.get(encoding, allowed.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def coded_etag(etag: str, encoding: str) -> str:
+    # Un ETag fort désigne une représentation précise : la
+    # version compressée a donc son propre tag ("abc" → "abc-gzip").
+    # Les ETag faibles (W/) restent valables pour tous les encodages.
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def etag_base(etag: str) -> str:
+    # Inverse de coded_etag, pour comparer un If-None-Match reçu
+    # quel que soit l'encodage de la réponse d'origine
+    etag = etag.strip().removeprefix("W/")
+    for encoding in ENCODING_PREFERENCE:
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+def _header(headers: list, name: bytes) -> bytes | None:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _add_vary(headers: list):
+    vary = _header(headers, b"vary")
+    if vary is None:
+        headers.append((b"vary", b"Accept-Encoding"))
+    elif b"accept-encoding" not in vary.lower() and vary != b"*":
+        headers[:] = [(k, v) for k, v in headers if k.lower() != b"vary"]
+        headers.append((b"vary", vary + b", Accept-Encoding"))
+
+
+class CompressionMiddleware:
+
+    def __init__(self, app, minimum_size: int = 1024,
+                 levels: dict[str, int] | None = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+        self.encoders = available_encoders()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = None
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        # Sans encodage accepté, la réponse passe telle quelle mais
+        # reçoit quand même "Vary: Accept-Encoding"
+        encoding = choose_encoding(accept, self.encoders)
+        responder = _CompressedResponder(
+            send, encoding, self.encoders.get(encoding),
+            self.levels.get(encoding), self.minimum_size)
+        await self.app(scope, receive, responder)
+
+
+class _CompressedResponder:
+    # Intercepte les messages ASGI d'une réponse
+
+    def __init__(self, send, encoding: str | None, encoder_cls, level,
+                 minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.encoder_cls = encoder_cls
+        self.level = level
+        self.minimum_size = minimum_size
+        self.start_message = None
+        # None tant que "minimum_size" octets n'ont pas été vus
+        self.encoder = None
+        self.passthrough = False
+        self.pending = b""
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self._on_start(message)
+            if self.passthrough:
+                await self.send(self.start_message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            self.pending += body
+            if len(self.pending) < self.minimum_size:
+                if more_body:
+                    # On attend d'en savoir plus avant de décider
+                    return
+                # Réponse trop petite : envoyée telle quelle
+                await self._send_start()
+                await self.send({"type": "http.response.body",
+                                 "body": self.pending,
+                                 "more_body": False})
+                return
+            self._start_encoder()
+            await self._send_start()
+            body, self.pending = self.pending, b""
+
+        chunk = self.encoder.compress(body)
+        if more_body:
+            # Streaming : on pousse ce qui est compressé
+            chunk += self.encoder.flush()
+            if chunk:
+                await self.send({"type": "http.response.body",
+                                 "body": chunk, "more_body": True})
+            return
+        chunk += self.encoder.finish()
+        await self.send({"type": "http.response.body", "body": chunk,
+                         "more_body": False})
+
+    def _on_start(self, message):
+        headers = list(message.get("headers", []))
+        content_type = (_header(headers, b"content-type") or b"").decode(
+            "latin-1").split(";")[0].strip().lower()
+        cache_control = (_header(headers, b"cache-control") or b"").lower()
+        compressible = content_type in COMPRESSIBLE_TYPES
+        if compressible:
+            # La réponse dépend d'Accept-Encoding pour les caches
+            _add_vary(headers)
+        self.start_message = {**message, "headers": headers}
+        if (not compressible
+                or self.encoder_cls is None
+                or _header(headers, b"content-encoding") is not None
+                or b"no-transform" in cache_control
+                or message["status"] in (204, 304)
+                or message["status"] < 200):
+            self.passthrough = True
+
+    async def _send_start(self):
+        await self.send(self.start_message)
+
+    def _start_encoder(self):
+        self.encoder = self.encoder_cls(self.level)
+        headers = []
+        for key, value in self.start_message["headers"]:
+            if key.lower() == b"content-length":
+                continue
+            if key.lower() == b"etag":
+                value = coded_etag(value.decode("latin-1"),
+                                   self.encoding).encode("latin-1")
+            headers.append((key, value))
+        headers.append((b"content-encoding", self.encoding.encode()))
+        self.start_message["headers"] = headers
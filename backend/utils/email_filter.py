@@ -0,0 +1,227 @@
+# utils/email_filter.py
+
+# Filtre de Bloom des emails inscrits.
+# Il répond "peut-être inscrit" ou "certainement inconnu" :
+# pour un email certainement inconnu, /token et /register
+# évitent la requête SQL (attaques par credential stuffing).
+# Un filtre de Bloom n'a jamais de faux négatif tant que tous
+# les emails inscrits y ont été ajoutés : tant qu'il n'est pas
+# entièrement construit, il répond toujours "peut-être".
+import hashlib
+import logging
+import math
+import os
+import threading
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from models.user import User
+from redis_client import r
+
+logger = logging.getLogger(__name__)
+
+# Clés Redis du backend "redis"
+REDIS_BITS_KEY = "email_filter:bits"
+REDIS_READY_KEY = "email_filter:ready"
+# Le backend "redis" réserve un bit témoin juste après les bits
+# du filtre : posé au début de build(), jamais par add(). Si la
+# clé des bits est évincée (maxmemory), le BITFIELD SET d'un
+# add() la recrée sans ce bit : le filtre est alors incomplet.
+
+# Nombre d'emails lus par aller-retour lors de la construction
+BUILD_BATCH_SIZE = 10_000
+
+
+class EmailFilterUnavailable(Exception):
+    # Redis injoignable : l'email n'a pu être ni ajouté au filtre
+    # partagé ni marqué comme incomplet. Les autres workers
+    # répondraient "certainement inconnu" une fois Redis revenu.
+    pass
+
+
+class BloomFilter:
+    # Calcule les positions des bits d'un élément ; le stockage
+    # des bits est laissé à EmailFilter (mémoire ou Redis)
+
+    def __init__(self, capacity: int, error_rate: float):
+        # Taille optimale : m = -n ln(p) / ln(2)², k = m/n ln(2)
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate)
+                               / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity
+                                       * math.log(2)))
+
+    def offsets(self, item: str) -> list[int]:
+        # Double hachage (Kirsch-Mitzenmacher) : deux valeurs de
+        # 64 bits issues d'un seul blake2b suffisent pour k positions
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+
+class EmailFilter:
+
+    def __init__(self, bloom: BloomFilter, backend: str = "memory",
+                 redis_client=None):
+        self.bloom = bloom
+        self.backend = backend
+        self.redis = redis_client
+        self._bits = (bytearray((bloom.size + 7) // 8)
+                      if backend == "memory" else None)
+        self._lock = threading.Lock()
+        # True une fois tous les emails existants ajoutés
+        self.ready = False
+
+    @property
+    def enabled(self) -> bool:
+        if self.backend == "memory":
+            return True
+        return self.backend == "redis" and self.redis is not None
+
+    def add(self, email: str):
+        if not self.enabled:
+            return
+        offsets = self.bloom.offsets(email)
+        if self._bits is not None:
+            with self._lock:
+                for offset in offsets:
+                    self._bits[offset >> 3] |= 1 << (offset & 7)
+            return
+        try:
+            # Un seul BITFIELD : les SET puis la lecture du bit témoin
+            *_, sentinel = self.redis.execute_command(
+                "BITFIELD", REDIS_BITS_KEY,
+                *self._bitfield_args("SET", offsets),
+                "GET", "u1", self.bloom.size)
+            if sentinel:
+                return
+            # Bits évincés (ou filtre jamais construit) : les bits
+            # recréés ne contiennent pas les emails existants
+            self._disable("bits du filtre absents de Redis")
+        except RedisError:
+            # L'email risque de manquer dans le filtre partagé :
+            # on invalide le filtre pour éviter un faux négatif
+            logger.exception("Impossible d'ajouter l'email au filtre")
+            try:
+                self._disable("échec de l'ajout d'un email")
+            except RedisError as exc:
+                raise EmailFilterUnavailable(str(exc)) from exc
+
+    def might_exist(self, email: str) -> bool:
+        # False uniquement si l'email n'a certainement jamais
+        # été inscrit ; True en cas de doute ou de panne Redis
+        if not self.enabled or not self.ready:
+            return True
+        offsets = self.bloom.offsets(email)
+        if self._bits is not None:
+            bits = self._bits
+            return all(bits[offset >> 3] & (1 << (offset & 7))
+                       for offset in offsets)
+        try:
+            # Un seul aller-retour : marqueur + BITFIELD GET des
+            # bits de l'email et du bit témoin
+            ready, *bits, sentinel = self._redis_state(offsets)
+        except RedisError:
+            return True
+        # Sans le marqueur ou le bit témoin (éviction), doute
+        return not ready or not sentinel or all(bits)
+
+    def refresh(self) -> bool:
+        # Relit l'état du filtre partagé : True s'il est complet
+        # (marqueur présent et bit témoin intact). Permet à un
+        # worker de se réactiver après la reconstruction faite
+        # par un autre (voir main.py).
+        if self._bits is not None or not self.enabled:
+            return self.ready
+        try:
+            ready, sentinel = self._redis_state([])
+        except RedisError:
+            return self.ready
+        self.ready = bool(ready and sentinel)
+        return self.ready
+
+    def build(self, db: Session):
+        # Ajoute tous les emails existants en parcourant la table
+        # users par lots (curseur côté serveur sous PostgreSQL)
+        if not self.enabled:
+            return
+        count = 0
+        pending: list[int] = []
+        if self._bits is None:
+            # Bit témoin posé avant la lecture : un add() concurrent
+            # écrit alors dans la même clé sans se croire perdu
+            self._redis_set([self.bloom.size])
+        result = db.execute(
+            select(User.email).execution_options(yield_per=BUILD_BATCH_SIZE)
+        )
+        for email in result.scalars():
+            if self._bits is not None:
+                self.add(email)
+            else:
+                pending.extend(self.bloom.offsets(email))
+                if len(pending) >= BUILD_BATCH_SIZE:
+                    self._redis_set(pending)
+                    pending = []
+            count += 1
+        if pending:
+            self._redis_set(pending)
+        if self.redis is not None and self._bits is None:
+            self.redis.set(REDIS_READY_KEY, "1")
+        self.ready = True
+        logger.info("Filtre des emails construit (%d emails)", count)
+
+    def _disable(self, reason: str):
+        # Filtre incomplet : tous les workers répondent "peut-être"
+        # jusqu'à la prochaine reconstruction (voir main.py)
+        logger.warning("Filtre des emails désactivé : %s", reason)
+        self.ready = False
+        self.redis.delete(REDIS_READY_KEY)
+
+    def _redis_state(self, offsets: list[int]) -> list:
+        # [marqueur présent, bits des offsets..., bit témoin]
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.exists(REDIS_READY_KEY)
+        pipe.execute_command(
+            "BITFIELD", REDIS_BITS_KEY,
+            *self._bitfield_args("GET", offsets + [self.bloom.size]))
+        ready, bits = pipe.execute()
+        return [ready, *bits]
+
+    def _redis_set(self, offsets: list[int]):
+        self.redis.execute_command("BITFIELD", REDIS_BITS_KEY,
+                                   *self._bitfield_args("SET", offsets))
+
+    @staticmethod
+    def _bitfield_args(op: str, offsets: list[int]) -> list:
+        args: list = []
+        for offset in offsets:
+            args.extend((op, "u1", offset))
+            if op == "SET":
+                args.append(1)
+        return args
+
+
+def resolve_backend(backend: str, redis_client) -> str:
+    # "auto" : le filtre doit voir toutes les inscriptions, donc
+    # être partagé (Redis) dès qu'il y a plusieurs workers
+    # (WEB_CONCURRENCY, lu aussi par uvicorn pour --workers)
+    if backend != "auto":
+        return backend
+    if redis_client is not None:
+        return "redis"
+    if int(os.environ.get("WEB_CONCURRENCY", "1") or 1) > 1:
+        return "off"
+    return "memory"
+
+
+# Instance partagée par les routes d'authentification et le CRUD
+email_filter = EmailFilter(
+    BloomFilter(settings.EMAIL_FILTER_CAPACITY,
+                settings.EMAIL_FILTER_ERROR_RATE),
+    backend=resolve_backend(settings.EMAIL_FILTER_BACKEND, r),
+    redis_client=r,
+)
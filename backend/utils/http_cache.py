@@ -0,0 +1,53 @@
+# utils/http_cache.py
+
+# En-têtes Cache-Control par défaut selon la route.
+# Une route qui fixe elle-même Cache-Control (ex: GET /menu,
+# SSE /kitchen/events) garde sa valeur.
+# Les données des routes admin / commandes sont personnelles :
+# elles ne doivent être gardées ni par un proxy ni par le
+# navigateur (poste partagé au comptoir du restaurant).
+
+# (préfixe de chemin, Cache-Control) : la première règle qui
+# correspond s'applique
+DEFAULT_CACHE_RULES = (
+    ("/admin", "private, no-store"),
+    ("/orders", "private, no-store"),
+    ("/kitchen", "private, no-store"),
+    ("/token", "no-store"),
+    ("/register", "no-store"),
+    ("/menu", "public, no-cache"),
+)
+
+
+def cache_control_for(path: str, rules=DEFAULT_CACHE_RULES) -> str | None:
+    for prefix, value in rules:
+        if path == prefix or path.startswith(prefix + "/"):
+            return value
+    return None
+
+
+class CacheControlMiddleware:
+
+    def __init__(self, app, rules=DEFAULT_CACHE_RULES):
+        self.app = app
+        self.rules = rules
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        value = cache_control_for(scope["path"], self.rules)
+        if value is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cache_control(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                if not any(key.lower() == b"cache-control"
+                           for key, _ in headers):
+                    headers.append((b"cache-control", value.encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_control)
@@ -0,0 +1,143 @@
+# utils/kitchen_hub.py
+
+# Diffusion en temps réel des commandes vers les écrans cuisine
+# (WebSocket /kitchen/ws ou SSE /kitchen/events).
+# - publish() peut être appelé depuis n'importe quel thread
+#   (worker de commandes, routes synchrones) : le message est
+#   publié sur le canal Redis KITCHEN_CHANNEL
+# - chaque worker uvicorn a un seul abonnement Redis, qui
+#   redistribue les messages à ses connexions locales
+# - sans Redis, les messages restent dans le processus courant
+# Chaque connexion a une file d'envoi bornée : un écran trop lent
+# qui la remplit est déconnecté au lieu de faire grossir la
+# mémoire du worker.
+import asyncio
+import json
+import logging
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+from config.settings import settings
+from redis_client import r
+
+logger = logging.getLogger(__name__)
+
+KITCHEN_CHANNEL = "kitchen:orders"
+
+
+class Subscriber:
+    # Une connexion (WebSocket ou SSE) ; __slots__ pour limiter
+    # la mémoire avec des milliers d'écrans connectés
+    __slots__ = ("queue", "evicted")
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(queue_size)
+        # True si la connexion a été coupée pour lenteur
+        self.evicted = False
+
+
+class KitchenHub:
+
+    def __init__(self, redis_client=None, redis_url: str = "",
+                 queue_size: int = 100):
+        self.redis = redis_client
+        self.redis_url = redis_url
+        self.queue_size = queue_size
+        self._subscribers: set[Subscriber] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._listener: asyncio.Task | None = None
+        self.evicted = 0
+
+    @property
+    def connections(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def broadcast_local(self, message: str):
+        # À appeler dans la boucle asyncio du worker
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._evict(subscriber)
+
+    def _evict(self, subscriber: Subscriber):
+        # File pleine : connexion trop lente, on la coupe
+        subscriber.evicted = True
+        self.evicted += 1
+        self._close(subscriber)
+
+    def _close(self, subscriber: Subscriber):
+        # On vide la file et on y met None, que la boucle
+        # d'envoi interprète comme "fermer la connexion"
+        self._subscribers.discard(subscriber)
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    def publish(self, event: dict):
+        # Sérialisé une seule fois, quel que soit le nombre d'écrans
+        message = json.dumps(event, default=str)
+        if self.redis is not None:
+            try:
+                self.redis.publish(KITCHEN_CHANNEL, message)
+                return
+            except RedisError:
+                logger.exception("Publication Redis impossible, diffusion "
+                                 "limitée au worker courant")
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self.broadcast_local, message)
+
+    async def _listen(self):
+        client = aioredis.Redis.from_url(self.redis_url,
+                                         decode_responses=True)
+        try:
+            while True:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                try:
+                    await pubsub.subscribe(KITCHEN_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self.broadcast_local(message["data"])
+                except RedisError:
+                    logger.warning("Abonnement Redis cuisine perdu, "
+                                   "reconnexion")
+                    await asyncio.sleep(1.0)
+                finally:
+                    await pubsub.aclose()
+        finally:
+            await client.aclose()
+
+    async def start(self):
+        # Appelé par le lifespan, dans la boucle du worker
+        self._loop = asyncio.get_running_loop()
+        if self.redis is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        # Ferme proprement les connexions encore ouvertes
+        for subscriber in list(self._subscribers):
+            self._close(subscriber)
+
+
+def notify_orders_created(orders: list[dict]):
+    # Appelé par le worker de commandes après enregistrement
+    for order in orders:
+        kitchen_hub.publish({"type": "order_created", "order": order})
+
+
+# Instance partagée, démarrée / arrêtée par le lifespan de main.py
+kitchen_hub = KitchenHub(r, settings.REDIS_URL,
+                         queue_size=settings.KITCHEN_QUEUE_SIZE)
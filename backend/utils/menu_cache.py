@@ -0,0 +1,154 @@
+# utils/menu_cache.py
+
+# Cache de la carte publique (GET /menu).
+# La carte est lue en base une fois, sérialisée en JSON et
+# compressée en gzip une seule fois par version ; les requêtes
+# suivantes renvoient directement ces octets, avec un ETag fort
+# (hash du contenu, identique sur tous les workers) pour les 304 :
+# "<hash>" pour le JSON brut, "<hash>-gzip" pour la version gzip.
+# Invalidation :
+# - localement dès qu'une écriture a lieu dans ce processus
+# - dans les autres workers via Redis pub/sub (canal MENU_CHANNEL)
+# - par sécurité après "ttl" secondes (message pub/sub manqué)
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from crud import menu as crud_menu
+from utils.compression import coded_etag, etag_base
+from redis_client import r
+from schemas.menu import MenuItemOut
+
+logger = logging.getLogger(__name__)
+
+MENU_CHANNEL = "menu:invalidate"
+
+
+@dataclass(frozen=True, slots=True)
+class CachedMenu:
+    # Liste des plats (pour les autres modules, ex: commandes)
+    items: tuple
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    gzip_etag: str
+    expires_at: float
+
+
+def serialize_menu(items: list, expires_at: float = 0.0) -> CachedMenu:
+    payload = [MenuItemOut.model_validate(item).model_dump(mode="json")
+               for item in items]
+    body = json.dumps(payload, ensure_ascii=False,
+                      separators=(",", ":")).encode()
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return CachedMenu(
+        items=tuple(payload),
+        body=body,
+        # Niveau max : la compression n'est faite qu'une fois
+        # par version de la carte
+        gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+        etag=etag,
+        gzip_etag=coded_etag(etag, "gzip"),
+        expires_at=expires_at,
+    )
+
+
+class MenuCache:
+
+    def __init__(self, redis_client=None, ttl: float = 300.0):
+        self.redis = redis_client
+        self.ttl = ttl
+        self._entry: CachedMenu | None = None
+        # Incrémenté à chaque invalidation : une lecture commencée
+        # avant une invalidation ne remet pas l'ancienne carte en cache
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def get(self, db: Session) -> CachedMenu:
+        entry = self._entry
+        if entry is not None and entry.expires_at > time.monotonic():
+            return entry
+        # Un seul worker thread recharge, les autres attendent
+        with self._lock:
+            entry = self._entry
+            if entry is not None and entry.expires_at > time.monotonic():
+                return entry
+            generation = self._generation
+            entry = serialize_menu(crud_menu.get_menu_items(db),
+                                   time.monotonic() + self.ttl)
+            if generation == self._generation:
+                self._entry = entry
+            return entry
+
+    def drop(self):
+        # Invalidation locale uniquement
+        self._generation += 1
+        self._entry = None
+
+    def invalidate(self):
+        # À appeler après chaque écriture sur la carte
+        self.drop()
+        if self.redis is None:
+            return
+        try:
+            self.redis.publish(MENU_CHANNEL, "1")
+        except RedisError:
+            # Les autres workers se mettront à jour au bout du TTL
+            logger.exception("Impossible de diffuser l'invalidation du menu")
+
+    def _listen(self):
+        while not self._stopping.is_set():
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(MENU_CHANNEL)
+                # Des messages ont pu être manqués avant l'abonnement
+                self.drop()
+                while not self._stopping.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.drop()
+            except RedisError:
+                logger.warning("Abonnement Redis du menu perdu, reconnexion")
+                self._stopping.wait(1.0)
+            finally:
+                pubsub.close()
+
+    def start(self):
+        if self.redis is None or self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._listen,
+                                        name="menu-cache-listener",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+            self._thread = None
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # Comparaison faible, comme le veut RFC 9110 pour If-None-Match,
+    # qui accepte aussi la variante compressée du même contenu
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    base = etag_base(etag)
+    return any(etag_base(tag) == base for tag in if_none_match.split(","))
+
+
+# Instance partagée, démarrée / arrêtée par le lifespan de main.py
+menu_cache = MenuCache(r, ttl=settings.MENU_CACHE_TTL_SECONDS)
@@ -0,0 +1,320 @@
+# utils/order_queue.py
+
+# File des commandes : POST /orders ne touche pas la base, il
+# ajoute la commande validée dans un flux Redis (ORDERS_STREAM)
+# et répond tout de suite avec l'id de la commande.
+# OrderConsumer (un thread par worker, dans un groupe de
+# consommateurs Redis) lit le flux par lots et enregistre les
+# commandes en base dans une seule transaction par lot :
+# - si le lot échoue, les commandes sont réessayées une par une
+# - une commande rejetée par la base (contrainte, donnée
+#   invalide) reste "pending" dans Redis et est reprise
+#   (XAUTOCLAIM) après ORDERS_RETRY_IDLE_MS
+# - après ORDERS_MAX_DELIVERIES tentatives elle part dans le flux
+#   ORDERS_DEAD_STREAM (dead-letter) pour analyse manuelle
+# - base indisponible (connexion perdue, panne) : pas de retry
+#   commande par commande ni de dead-letter, les messages restent
+#   en attente sans que la tentative compte, et le worker attend
+#   un délai qui double à chaque échec (comme utils/audit.py)
+# - POST /orders n'authentifie le client que par son token : les
+#   commandes d'un compte désactivé depuis sont écartées ici
+#   (dead-letter), avec une requête par lot
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime
+
+import redis
+from redis.exceptions import RedisError, ResponseError
+from sqlalchemy.exc import DataError, IntegrityError
+
+from config.settings import settings
+from crud.auth import inactive_user_ids
+from crud.order import persist_orders
+from database import SessionLocal
+from redis_client import r
+
+logger = logging.getLogger(__name__)
+
+ORDERS_STREAM = "orders:incoming"
+ORDERS_DEAD_STREAM = "orders:dead"
+ORDERS_GROUP = "order-writers"
+
+# Taille max approximative du flux (les messages acquittés ne
+# sont plus utiles, on garde une marge pour l'analyse)
+ORDERS_STREAM_MAXLEN = 100_000
+
+
+# Erreurs dues à la commande elle-même : la réessayer ne sert à
+# rien. Toute autre erreur est attribuée à la base (panne,
+# surcharge) et ne mène jamais au dead-letter.
+POISON_ERRORS = (IntegrityError, DataError, KeyError, TypeError,
+                 ValueError)
+
+
+class OrderQueueUnavailable(Exception):
+    # Redis absent ou en panne : la commande n'a pas été prise
+    pass
+
+
+class _DatabaseUnavailable(Exception):
+    pass
+
+
+def enqueue_order(user_id: int, items: list[dict], total: float,
+                  note: str | None = None) -> str:
+    # Ajoute une commande déjà validée au flux et renvoie son id
+    if r is None:
+        raise OrderQueueUnavailable("Redis n'est pas configuré")
+    order_id = str(uuid.uuid4())
+    payload = {
+        "id": order_id,
+        "user_id": user_id,
+        "items": items,
+        "total": total,
+        "note": note,
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    try:
+        r.xadd(ORDERS_STREAM, {"order": json.dumps(payload)},
+               maxlen=ORDERS_STREAM_MAXLEN, approximate=True)
+    except RedisError as exc:
+        raise OrderQueueUnavailable(str(exc)) from exc
+    return order_id
+
+
+def _stream_id(message_id: str) -> tuple[int, int]:
+    # "1700000000000-12" : ordre numérique, pas lexicographique
+    milliseconds, sequence = message_id.split("-")
+    return int(milliseconds), int(sequence)
+
+
+class OrderConsumer:
+
+    def __init__(self, redis_client, session_factory,
+                 batch_size: int = 100, block_ms: int = 1000,
+                 retry_idle_ms: int = 30_000, max_deliveries: int = 5,
+                 on_persisted=None, backoff: float = 1.0,
+                 max_backoff: float = 60.0):
+        self.redis = redis_client
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.retry_idle_ms = retry_idle_ms
+        self.max_deliveries = max_deliveries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # Appelé avec la liste des commandes enregistrées (ex:
+        # notification de la cuisine)
+        self.on_persisted = on_persisted
+        self.name = f"{socket.gethostname()}-{os.getpid()}"
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.persisted = 0
+        self.dead_lettered = 0
+        # Échecs consécutifs dus à la base (délai avant reprise)
+        self._failures = 0
+
+    def ensure_group(self):
+        try:
+            self.redis.xgroup_create(ORDERS_STREAM, ORDERS_GROUP, id="0",
+                                     mkstream=True)
+        except ResponseError as exc:
+            # Le groupe existe déjà (autre worker, redémarrage)
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    def run_once(self) -> int:
+        # Traite un lot : d'abord les messages en échec à
+        # reprendre, sinon les nouveaux. Renvoie le nombre de
+        # messages lus.
+        messages = self._claim_stale()
+        if not messages:
+            response = self.redis.xreadgroup(
+                ORDERS_GROUP, self.name, {ORDERS_STREAM: ">"},
+                count=self.batch_size, block=self.block_ms)
+            messages = response[0][1] if response else []
+        if messages:
+            self._process(messages)
+        return len(messages)
+
+    def _claim_stale(self) -> list:
+        result = self.redis.xautoclaim(
+            ORDERS_STREAM, ORDERS_GROUP, self.name,
+            min_idle_time=self.retry_idle_ms, start_id="0-0",
+            count=self.batch_size)
+        # [curseur, messages, (ids supprimés depuis Redis 7)]
+        return [message for message in result[1] if message[1]]
+
+    def _process(self, messages: list):
+        orders = []
+        for message_id, fields in messages:
+            try:
+                orders.append((message_id, json.loads(fields["order"])))
+            except (KeyError, ValueError):
+                # Message illisible : inutile de le réessayer
+                self._dead_letter(message_id, fields, "message invalide")
+        try:
+            self._persist_batch(orders)
+        except _DatabaseUnavailable:
+            self._failures += 1
+            logger.warning("Base indisponible, %d commande(s) laissée(s) "
+                           "en attente, nouvel essai dans %.1f s",
+                           len(orders), self.retry_delay())
+            self._release([message_id for message_id, _ in orders])
+        else:
+            self._failures = 0
+
+    def _persist_batch(self, orders: list):
+        orders = self._reject_inactive(orders)
+        if not orders:
+            return
+        if self._persist([order for _, order in orders]):
+            self.redis.xack(ORDERS_STREAM, ORDERS_GROUP,
+                            *[message_id for message_id, _ in orders])
+            return
+        # Le lot a été rejeté : on isole la ou les commandes fautives
+        for message_id, order in orders:
+            if self._persist([order]):
+                self.redis.xack(ORDERS_STREAM, ORDERS_GROUP, message_id)
+            elif self._deliveries(message_id) >= self.max_deliveries:
+                self._dead_letter(message_id, {"order": json.dumps(order)},
+                                  "nombre maximal de tentatives atteint")
+
+    def _reject_inactive(self, orders: list) -> list:
+        if not orders:
+            return orders
+        db = self.session_factory()
+        try:
+            inactive = inactive_user_ids(
+                db, {order["user_id"] for _, order in orders})
+        except Exception as exc:
+            raise _DatabaseUnavailable(str(exc)) from exc
+        finally:
+            db.close()
+        kept = []
+        for message_id, order in orders:
+            if order["user_id"] in inactive:
+                self._dead_letter(message_id, {"order": json.dumps(order)},
+                                  "compte désactivé")
+            else:
+                kept.append((message_id, order))
+        return kept
+
+    def _persist(self, orders: list[dict]) -> bool:
+        db = self.session_factory()
+        try:
+            inserted = persist_orders(db, orders)
+            db.commit()
+        except POISON_ERRORS:
+            db.rollback()
+            logger.exception("Échec de l'enregistrement de %d commande(s)",
+                             len(orders))
+            return False
+        except Exception as exc:
+            raise _DatabaseUnavailable(str(exc)) from exc
+        finally:
+            db.close()
+        self.persisted += len(inserted)
+        if inserted and self.on_persisted is not None:
+            ids = set(inserted)
+            try:
+                self.on_persisted([order for order in orders
+                                   if order["id"] in ids])
+            except Exception:
+                logger.exception("Échec de la notification des commandes")
+        return True
+
+    def _deliveries(self, message_id) -> int:
+        pending = self.redis.xpending_range(
+            ORDERS_STREAM, ORDERS_GROUP, min=message_id, max=message_id,
+            count=1)
+        return pending[0]["times_delivered"] if pending else 0
+
+    def _release(self, message_ids: list):
+        # Annule la livraison en cours : le compteur de livraisons
+        # redescend d'un cran et le message est immédiatement
+        # reprenable par XAUTOCLAIM (ce worker ou un autre)
+        if not message_ids:
+            return
+        ordered = sorted(message_ids, key=_stream_id)
+        pending = self.redis.xpending_range(
+            ORDERS_STREAM, ORDERS_GROUP, min=ordered[0], max=ordered[-1],
+            count=len(message_ids), consumername=self.name)
+        wanted = set(message_ids)
+        pipe = self.redis.pipeline(transaction=False)
+        for entry in pending:
+            if entry["message_id"] not in wanted:
+                continue
+            pipe.xclaim(ORDERS_STREAM, ORDERS_GROUP, self.name, 0,
+                        [entry["message_id"]], idle=self.retry_idle_ms,
+                        retrycount=max(entry["times_delivered"] - 1, 0),
+                        justid=True)
+        pipe.execute()
+
+    def retry_delay(self) -> float:
+        # 0 si la base a répondu au dernier lot, sinon
+        # backoff x 2^(échecs - 1), plafonné à max_backoff
+        if not self._failures:
+            return 0.0
+        return min(self.backoff * 2 ** (self._failures - 1),
+                   self.max_backoff)
+
+    def _dead_letter(self, message_id, fields: dict, reason: str):
+        pipe = self.redis.pipeline()
+        pipe.xadd(ORDERS_DEAD_STREAM, {**fields, "reason": reason,
+                                       "source_id": message_id})
+        pipe.xack(ORDERS_STREAM, ORDERS_GROUP, message_id)
+        pipe.execute()
+        self.dead_lettered += 1
+        logger.error("Commande %s envoyée en dead-letter : %s",
+                     message_id, reason)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                self.ensure_group()
+                while not self._stopping.is_set():
+                    delay = self.retry_delay()
+                    if delay and self._stopping.wait(delay):
+                        break
+                    self.run_once()
+            except RedisError:
+                logger.warning("Connexion Redis perdue par le worker de "
+                               "commandes, nouvelle tentative")
+                self._stopping.wait(1.0)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name="order-consumer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(self.block_ms / 1000 + 5)
+            self._thread = None
+
+
+def create_order_consumer(on_persisted=None) -> OrderConsumer | None:
+    # Le worker a sa propre connexion : XREADGROUP BLOCK dépasse
+    # le timeout court du client partagé (redis_client.r)
+    if not settings.REDIS_URL:
+        return None
+    client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True,
+                                  socket_connect_timeout=1,
+                                  socket_timeout=10)
+    return OrderConsumer(
+        client,
+        SessionLocal,
+        batch_size=settings.ORDERS_BATCH_SIZE,
+        retry_idle_ms=settings.ORDERS_RETRY_IDLE_MS,
+        max_deliveries=settings.ORDERS_MAX_DELIVERIES,
+        on_persisted=on_persisted,
+    )
@@ -0,0 +1,94 @@
+# utils/search.py
+
+# Outils pour la recherche d'utilisateurs par nom / email
+# (/admin/users?q=).
+# - PostgreSQL : ILIKE '%...%' servi par les index GIN pg_trgm
+#   (voir la migration 3b7e9c1d2a4f) et préfixes par les index
+#   b-tree lower(...) COLLATE "C" (migration 6f3d1a9c8e27)
+# - SQLite (exécution locale) : table virtuelle FTS5 avec le
+#   tokenizer "trigram", maintenue par des triggers
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+# Nom de la table FTS5 miroir de la table users
+SQLITE_FTS_TABLE = "users_fts"
+
+# Le tokenizer trigram ne sait chercher que des termes d'au
+# moins 3 caractères (en dessous, on retombe sur LIKE)
+MIN_TRIGRAM_LENGTH = 3
+
+# PostgreSQL : nombre maximal de lignes retenues par chaque
+# branche de recherche (préfixe / sous-chaîne, nom / email)
+# avant le classement par similarité
+SEARCH_CANDIDATES = 100
+
+# Passe à True une fois la table FTS5 créée avec succès
+_sqlite_fts_ready = False
+
+_SQLITE_FTS_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} "
+    "USING fts5(name, email, content='users', content_rowid='id', "
+    "tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai "
+    "AFTER INSERT ON users BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, email) "
+    "VALUES (new.id, new.name, new.email); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad "
+    "AFTER DELETE ON users BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name, email) "
+    "VALUES ('delete', old.id, old.name, old.email); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au "
+    "AFTER UPDATE OF name, email ON users BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name, email) "
+    "VALUES ('delete', old.id, old.name, old.email); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, email) "
+    "VALUES (new.id, new.name, new.email); END",
+]
+
+
+def escape_like(term: str) -> str:
+    # Échappe les jokers de LIKE pour qu'un "%" ou un "_"
+    # saisi par l'admin soit cherché littéralement
+    return (term.replace("\\", "\\\\")
+                .replace("%", "\\%")
+                .replace("_", "\\_"))
+
+
+def fts_phrase(term: str) -> str:
+    # Transforme le terme en phrase FTS5 ("...") : les
+    # guillemets sont doublés, le reste n'est pas interprété
+    return '"' + term.replace('"', '""') + '"'
+
+
+def setup_sqlite_fts(engine: Engine) -> None:
+    # Crée (si besoin) la table FTS5 et ses triggers. L'index n'est
+    # reconstruit à partir de la table users que lorsque la table
+    # FTS5 vient d'être créée : ensuite les triggers le tiennent à
+    # jour, inutile de tout réindexer à chaque démarrage.
+    # Sans effet hors SQLite ; si FTS5/trigram n'est pas compilé
+    # dans SQLite, la recherche reste en LIKE.
+    global _sqlite_fts_ready
+    if engine.dialect.name != "sqlite":
+        return
+    try:
+        with engine.begin() as conn:
+            created = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = :name"),
+                {"name": SQLITE_FTS_TABLE},
+            ).first() is None
+            for ddl in _SQLITE_FTS_DDL:
+                conn.execute(text(ddl))
+            if created:
+                conn.execute(text(
+                    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) "
+                    "VALUES ('rebuild')"
+                ))
+    except OperationalError:
+        _sqlite_fts_ready = False
+        return
+    _sqlite_fts_ready = True
+
+
+def sqlite_fts_ready() -> bool:
+    return _sqlite_fts_ready
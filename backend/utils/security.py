@@ -16,9 +16,12 @@ from jose import JWTError, jwt
 # de données
 from sqlalchemy.orm import Session
 
-# On importe le modèle User pour pouvoir faire
-# une requête sur la base de données
-from models.user import User
+# Lecture allégée de l'utilisateur (requête Core précompilée)
+from crud.auth import AuthUser, get_auth_user_by_email
+
+# Utilisateur tel que décrit par le token (sans base)
+from dataclasses import dataclass
+from models.user import UserRole
 
 # Fonction utilitaire pour obtenir une
 # session de base de données
@@ -29,6 +32,7 @@ from datetime import datetime, timedelta
 
 # Pour hacher et vérifier les mots de passe
 from passlib.context import CryptContext
+from functools import lru_cache
 from config.settings import settings
 
 
@@ -61,6 +65,20 @@ def verify_password(plain_password: str, hashed_password: str):
     # omparer le mot de passe saisi avec le hash
     return pwd_context.verify(plain_password, hashed_password)
 
+
+# 🕵️ Hash factice calculé une seule fois (au premier appel)
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    return pwd_context.hash("dummy-password-for-unknown-users")
+
+
+def fake_verify_password(plain_password: str) -> bool:
+    # Même coût qu'un vrai verify_password (bcrypt) pour un
+    # email inconnu : le temps de réponse de /token ne révèle
+    # pas si le compte existe. Renvoie toujours False.
+    pwd_context.verify(plain_password, _dummy_hash())
+    return False
+
 # 🔒 Fonction pour hacher un mot de passe
 # en clair (lors de l'inscription par exemple)
 
@@ -116,48 +134,69 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
 
 def get_current_user(token: str = Depends(oauth2_scheme),
-                     db: Session = Depends(get_db)) -> User:
+                     db: Session = Depends(get_db)) -> AuthUser:
+    return get_user_from_token(token, db)
+
 
-    # Exception personnalisée à lever si le token
-    # est invalide ou que l'utilisateur n'existe pas
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    # Exception à lever si le token est invalide ou que
+    # l'utilisateur n'existe pas
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token invalide",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def decode_access_token(token: str) -> dict:
+    # On décode le token JWT avec la clé secrète
+    # et l'algorithme prévu
+    # Si le token est falsifié, expiré ou mal
+    # formé → cela lève une JWTError → 401
     try:
-        # On décode le token JWT avec la clé secrète
-        # et l'algorithme prévu
-        # Si le token est falsifié, expiré ou mal
-        # formé → cela lève une JWTError
-        payload = jwt.decode(token, settings.SECRET_KEY,
-                             algorithms=[settings.ALGORITHM])
-
-        # On récupère l'email (stocké dans "sub"
-        # quand le token a été créé)
-        email = payload.get("sub")
-        if not isinstance(email, str):
-            raise credentials_exception
-        # Si aucun email n'est trouvé dans le
-        # payload → token invalide
-        if email is None:
-            raise credentials_exception
-
-    # Si une erreur est levée pendant le décodage
-    # du token → on rejette l'accès
+        return jwt.decode(token, settings.SECRET_KEY,
+                          algorithms=[settings.ALGORITHM])
     except JWTError:
+        raise _credentials_exception()
+
+
+# Vérification du JWT et chargement de l'utilisateur, hors
+# dépendances FastAPI : utilisée aussi pour les WebSocket, où
+# le token arrive en paramètre de requête (pas de header
+# Authorization côté navigateur)
+def get_user_from_token(token: str, db: Session) -> AuthUser:
+
+    credentials_exception = _credentials_exception()
+
+    # On décode le token JWT : si le token est falsifié, expiré
+    # ou mal formé → 401
+    payload = decode_access_token(token)
+
+    # On récupère l'email (stocké dans "sub"
+    # quand le token a été créé)
+    email = payload.get("sub")
+    # Si aucun email n'est trouvé dans le
+    # payload → token invalide
+    if not isinstance(email, str):
         raise credentials_exception
 
-    # Requête SQLAlchemy pour récupérer l'utilisateur
-    # en base grâce à son email
-    user = db.query(User).filter(User.email == email).first()
+    # Requête pour récupérer l'utilisateur en base grâce à
+    # son email (même requête précompilée que le login)
+    user = get_auth_user_by_email(db, email)
 
     # Si aucun utilisateur n'est trouvé dans
     # la base → token invalide
     if user is None:
         raise credentials_exception
 
+    # Compte désactivé après l'émission du token : refusé tout
+    # de suite, sans attendre l'expiration du JWT
+    if user.is_active is False:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Compte désactivé",
+        )
+
     # Si tout est ok → on retourne l'objet
     # tilisateur (donc il est authentifié)
     return user
@@ -165,18 +204,18 @@ def get_current_user(token: str = Depends(oauth2_scheme),
 
 # Fonction de sécurité qui permet de restreindre
 # l'accès à certaines routes
-# Elle prend en paramètre le rôle requis pour
+# Elle prend en paramètre le ou les rôles autorisés à
 # accéder à la route (ex: "admin", "client", etc.)
 
-def require_role(role: str):
+def require_role(*roles: str):
     # Fonction interne qui va vérifier si l'utilisateur
-    # actuellement connecté a bien le rôle requis
+    # actuellement connecté a bien un des rôles requis
     # Elle dépend de `get_current_user`, donc elle extrait et
     # valide automatiquement le JWT pour récupérer l'utilisateur
-    def role_checker(current_user: User = Depends(get_current_user)):
+    def role_checker(current_user: AuthUser = Depends(get_current_user)):
 
-        # Si le rôle de l'utilisateur ne correspond pas à celui exigé
-        if current_user.role.value != role:
+        # Si le rôle de l'utilisateur ne fait pas partie des rôles exigés
+        if current_user.role.value not in roles:
 
             # On lève une erreur 403 Forbidden (accès interdit)
             raise HTTPException(
@@ -193,8 +232,52 @@ def require_role(role: str):
     return role_checker
 
 
+@dataclass(frozen=True, slots=True)
+class TokenUser:
+    # Identité portée par le JWT ("uid", "sub", "role")
+    id: int
+    email: str
+    role: UserRole
+
+
+def get_token_user(token: str = Depends(oauth2_scheme)) -> TokenUser:
+    # Authentification sans requête SQL, pour les routes les plus
+    # sollicitées (passage de commande) : on fait confiance aux
+    # claims signés du token. Un changement de rôle ou une
+    # désactivation n'est visible qu'à l'expiration du token ;
+    # les commandes d'un compte désactivé sont écartées par le
+    # worker (utils/order_queue.py).
+    payload = decode_access_token(token)
+    user_id = payload.get("uid")
+    email = payload.get("sub")
+    # Anciens tokens sans "uid" : il faut se reconnecter
+    if not isinstance(user_id, int) or not isinstance(email, str):
+        raise _credentials_exception()
+    try:
+        role = UserRole(payload.get("role"))
+    except ValueError:
+        raise _credentials_exception()
+    return TokenUser(user_id, email, role)
+
+
+def require_token_role(*roles: str):
+    # Comme require_role, mais à partir du token seul
+    def role_checker(current_user: TokenUser = Depends(get_token_user)):
+        if current_user.role.value not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Accés interdit"
+            )
+        return current_user
+    return role_checker
+
+
 # On crée des versions prêtes à l'emploi de la fonction
 # `require_role` pour chaque rôle :
 is_admin = require_role("admin")
 is_staff = require_role("staff")
 is_client = require_role("client")
+# Passage de commande : rôle lu dans le token, sans base
+is_client_token = require_token_role("client")
+# Gestion de la carte : personnel du restaurant ou admin
+is_staff_or_admin = require_role("staff", "admin")
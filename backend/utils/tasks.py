@@ -0,0 +1,43 @@
+# utils/tasks.py
+
+# Tâches de fond lancées au démarrage de l'application
+# (voir le lifespan dans main.py)
+import asyncio
+import logging
+import os
+
+from redis.exceptions import RedisError
+from starlette.concurrency import run_in_threadpool
+
+from redis_client import r
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(interval: float, func, *args,
+                           delay: float = 0):
+    # Exécute "func" (synchrone) dans le pool de threads toutes
+    # les "interval" secondes, la première fois après "delay".
+    # Une erreur est journalisée mais n'arrête pas la boucle.
+    await asyncio.sleep(delay)
+    while True:
+        try:
+            await run_in_threadpool(func, *args)
+        except Exception:
+            logger.exception("Échec de la tâche périodique %s",
+                             getattr(func, "__name__", func))
+        await asyncio.sleep(interval)
+
+
+def acquire_lease(name: str, seconds: float) -> bool:
+    # Bail Redis : un seul worker (tous hôtes confondus) obtient
+    # True par période de "seconds", y compris après un
+    # redémarrage. Sans Redis (un seul processus), toujours True.
+    if r is None:
+        return True
+    try:
+        return bool(r.set(f"lease:{name}", os.getpid(), nx=True,
+                          px=int(seconds * 1000)))
+    except RedisError:
+        logger.warning("Bail %s indisponible (Redis), tâche sautée", name)
+        return False
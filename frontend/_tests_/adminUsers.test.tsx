@@ -1,17 +1,62 @@
-import { render, screen } from "@testing-library/react";
+import { act, fireEvent, render, screen } from "@testing-library/react";
 import AdminUsersPage from "../src/app/admin/users/page";
+import { getUsers } from "../src/app/services/userService";
 
-jest.mock("../../src/services/userService", () => ({
-  getUsers: () => Promise.resolve([
-    { id: 1, name: "Admin", email: "admin@test.com", role: "admin" }
-  ]),
+jest.mock("next/navigation", () => ({
+  useRouter: () => ({
+    push: jest.fn(),
+  }),
+}));
+
+jest.mock("../src/app/services/userService", () => ({
+  getUsers: jest.fn(),
   updateUserRole: jest.fn()
 }));
 
+const mockedGetUsers = jest.mocked(getUsers);
+const SEARCH_PLACEHOLDER = "Rechercher par nom ou email...";
+
 describe("AdminUsersPage", () => {
-  it("affiche liste des utilisateurs", async () => {
+  beforeEach(() => {
+    jest.useFakeTimers();
+    mockedGetUsers.mockReset();
+    mockedGetUsers.mockResolvedValue([
+      { id: 1, name: "Admin", email: "admin@test.com", role: "admin" }
+    ]);
+  });
+
+  afterEach(() => {
+    jest.useRealTimers();
+  });
+
+  it("n'interroge pas le backend avant 2 caractères", () => {
     render(<AdminUsersPage />);
-    const name = await screen.findByText("Admin");
-    expect(name).toBeInTheDocument();
+    expect(screen.getByText(/Tapez au moins 2 caractères/)).toBeInTheDocument();
+
+    fireEvent.change(screen.getByPlaceholderText(SEARCH_PLACEHOLDER), { target: { value: "a" } });
+    act(() => {
+      jest.advanceTimersByTime(300);
+    });
+    expect(mockedGetUsers).not.toHaveBeenCalled();
+  });
+
+  it("affiche le résultat de la recherche après le délai", async () => {
+    render(<AdminUsersPage />);
+    const input = screen.getByPlaceholderText(SEARCH_PLACEHOLDER);
+
+    // Deux frappes rapprochées : une seule requête, avec le dernier terme
+    fireEvent.change(input, { target: { value: "ad" } });
+    fireEvent.change(input, { target: { value: "adm" } });
+    act(() => {
+      jest.advanceTimersByTime(299);
+    });
+    expect(mockedGetUsers).not.toHaveBeenCalled();
+
+    act(() => {
+      jest.advanceTimersByTime(1);
+    });
+    expect(mockedGetUsers).toHaveBeenCalledTimes(1);
+    expect(mockedGetUsers).toHaveBeenCalledWith("adm");
+    expect(await screen.findByText("Admin")).toBeInTheDocument();
   });
 });
@@ -6,24 +6,48 @@ import { User } from "../../interface/users";
 import { useRouter } from "next/navigation"; 
 
 
+// ⏱️ Délai avant d'interroger le backend pendant la frappe
+const SEARCH_DELAY_MS = 300;
+// 🔎 En dessous, on n'interroge pas : la table peut compter des millions de comptes
+const MIN_SEARCH_LENGTH = 2;
+
 export default function AdminUsersPage() {
   const [users, setUsers] = useState<User[]>([]);
-  const [loading, setLoading] = useState(true);
+  const [query, setQuery] = useState("");
+  const [loading, setLoading] = useState(false);
 const router = useRouter();
 useEffect(() => {
-  
-  getUsers()
-    .then((data)=>{
-      setUsers(data);
-      setLoading(false)
-    })
-    .catch((error) => {
-      console.error("Erreur lors du chargement des utilisateurs :", error);
-      alert("Veuillez vous connecter pour voir les utilisateurs.");
-      setLoading(false);
-      router.push("/auth/login"); // redirection vers login si erreur auth
-    });
-}, []);
+  const q = query.trim();
+  if (q.length < MIN_SEARCH_LENGTH) {
+    setUsers([]);
+    setLoading(false);
+    return;
+  }
+
+  // 🚫 Ignore la réponse d'une recherche dépassée par une frappe plus récente
+  let cancelled = false;
+  setLoading(true);
+  const timer = setTimeout(() => {
+    getUsers(q)
+      .then((data) => {
+        if (cancelled) return;
+        setUsers(data);
+        setLoading(false);
+      })
+      .catch((error) => {
+        if (cancelled) return;
+        console.error("Erreur lors de la recherche des utilisateurs :", error);
+        alert("Veuillez vous connecter pour voir les utilisateurs.");
+        setLoading(false);
+        router.push("/auth/login"); // redirection vers login si erreur auth
+      });
+  }, SEARCH_DELAY_MS);
+
+  return () => {
+    cancelled = true;
+    clearTimeout(timer);
+  };
+}, [query]);
 
 
   const handleRoleChange = async (userId: number, newRole: string) => {
@@ -35,11 +59,20 @@ useEffect(() => {
     }
   };
 
-  if (loading) return <p className="p-4">Chargement...</p>;
-
   return (
     <div className="p-6 max-w-4xl mx-auto">
       <h1 className="text-2xl font-bold mb-6">👑 Dashboard Admin – Utilisateurs</h1>
+      <input
+        type="search"
+        value={query}
+        onChange={(e) => setQuery(e.target.value)}
+        placeholder="Rechercher par nom ou email..."
+        className="border p-2 mb-4 w-full"
+      />
+      {loading && <p className="p-4">Chargement...</p>}
+      {!loading && query.trim().length < MIN_SEARCH_LENGTH && (
+        <p className="p-4">Tapez au moins {MIN_SEARCH_LENGTH} caractères pour rechercher un utilisateur.</p>
+      )}
       <table className="min-w-full border">
         <thead className="bg-gray-100">
           <tr>
@@ -17,7 +17,9 @@ export const getToken = (): string | null => {
 };
 
 // 🔄 Fonction pour récupérer tous les utilisateurs (admin uniquement)
-export const getUsers = async () => {
+// 🔎 Avec `q`, le backend fait la recherche par nom/email (index trigram)
+// au lieu de tout renvoyer pour filtrer côté client
+export const getUsers = async (q?: string) => {
   const token = getToken(); // 1️⃣ On récupère le token JWT stocké localement
 
   if (!token) {
@@ -27,6 +29,7 @@ export const getUsers = async () => {
   try {
     // 2️⃣ Appel HTTP vers l'API protégée avec le token dans le header
     const response = await axios.get(`${API_URL}/admin/users`, {
+      params: q ? { q } : undefined,
       headers: {
         Authorization: `Bearer ${token}`, // 🔐 Le backend va utiliser ce token pour vérifier l'identité
       },